@@ -0,0 +1,70 @@
+import os
+import random
+
+# Generates synthetic Endless/etheos style INI trees for benchmarking:
+# "### SECTION ###" headers, "# comment" lines, blank lines and "Key = Value" pairs.
+
+SECTIONS = ["SERVER", "DATABASE", "LOGGING", "RATES", "LIMITS", "NPC", "ITEMS", "MAP", "GUILDS", "MISC"]
+KEY_WORDS = ["Max", "Min", "Exp", "Drop", "Spawn", "Port", "Timeout", "Rate", "Limit", "Player",
+             "Connection", "Guild", "Item", "Npc", "Map", "Speed", "Delay", "Level", "Bank", "Chat"]
+WORDS = ["the", "server", "value", "players", "default", "seconds", "enable", "maximum", "rate", "number"]
+
+
+def make_value(rng):
+    kind = rng.random()
+    if kind < 0.5:
+        return str(rng.randint(0, 100000))
+    if kind < 0.7:
+        return rng.choice(["yes", "no", "true", "false"])
+    if kind < 0.85:
+        return f"{rng.random() * 10:.2f}"
+    return "./data/" + rng.choice(WORDS) + ".txt"
+
+
+def make_file(rng, lines, comment_density):
+    out = []
+    section = 0
+    key_counter = 0
+    while len(out) < lines:
+        if len(out) % 50 == 0:
+            out.append(f"### {SECTIONS[section % len(SECTIONS)]} ###")
+            section += 1
+            continue
+        roll = rng.random()
+        if roll < comment_density:
+            out.append("# " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 10))))
+        elif roll < comment_density + 0.05:
+            out.append("")
+        else:
+            key = "".join(rng.choice(KEY_WORDS) for _ in range(rng.randint(1, 3))) + str(key_counter)
+            key_counter += 1
+            out.append(f"{key} = {make_value(rng)}")
+    return "\n".join(out) + "\n"
+
+
+def generate_corpus(root, files=200, lines=300, comment_density=0.3, dirs=10, seed=1):
+    # Files are spread over `dirs` subdirectories (with one nested level) to exercise scanning
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        sub = os.path.join(root, f"server{i % dirs}", "data" if i % 3 == 0 else "config")
+        os.makedirs(sub, exist_ok=True)
+        path = os.path.join(sub, f"file{i}.ini")
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(make_file(rng, lines, comment_density))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate a synthetic INI corpus")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--comment-density", type=float, default=0.3)
+    parser.add_argument("--dirs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    paths = generate_corpus(args.root, args.files, args.lines, args.comment_density, args.dirs, args.seed)
+    print(f"Wrote {len(paths)} files under {args.root}")
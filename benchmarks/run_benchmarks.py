@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Allow importing from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config_parser import ConfigFile, ConfigLine
+from file_scanner import FolderScanner
+from search_index import SearchIndex
+from search_matcher import Matcher, MODE_KEY, MODE_REGEX
+from benchmarks.corpus import generate_corpus
+
+# Times the hot paths behind the GUI on a generated corpus and prints JSON:
+#   python benchmarks/run_benchmarks.py --files 500 --lines 400 --output before.json
+#   python benchmarks/run_benchmarks.py --files 500 --lines 400 --compare before.json
+# App.scan_files and App.search_files need a Tk window, so the scanner and the
+# search index they delegate to are timed directly.
+
+QUERIES = ["maxplayer", "port", "rate1", "zz_not_there", "ex"]
+REGEX_QUERIES = [r"port\s*=\s*80\d\d", r"^#.*default"]
+KEY_QUERIES = ["*Rate > 1", "Port", "Max*Player*"]
+
+
+def measure(func, repeat, setup=None):
+    # setup() runs untimed before each repetition
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.mean(times), 3),
+        "repeat": repeat,
+    }
+
+
+def bench_load(files, lazy):
+    def run():
+        for path in files:
+            config = ConfigFile()
+            config.load(path, lazy=lazy)
+            config.close()
+    return run
+
+
+def load_configs(files, configs):
+    # Fresh ConfigFiles for every repetition, so lookups start from a cold key map
+    # instead of hitting what the previous repetition cached
+    def setup():
+        configs[:] = []
+        for path in files:
+            config = ConfigFile()
+            config.load(path)
+            configs.append(config)
+    return setup
+
+
+def bench_get_value(configs, keys):
+    def run():
+        for config, file_keys in zip(configs, keys):
+            for key in file_keys:
+                config.get_value(key)
+    return run
+
+
+def bench_update_value(configs, keys):
+    counter = [0]
+    def run():
+        # A value that differs from every earlier repetition, so no update is a no-op
+        counter[0] += 1
+        value = f"bench{counter[0]}"
+        for config, file_keys in zip(configs, keys):
+            for key in file_keys:
+                config.update_value(key, value)
+    return run
+
+
+def bench_save(files):
+    counter = [0]
+    def run():
+        counter[0] += 1
+        for path in files:
+            config = ConfigFile()
+            config.load(path)
+            line = next(l for l in config.lines if l.type == ConfigLine.TYPE_KEY_VALUE)
+            config.update_line(line.line_num, str(counter[0]))
+            config.save(fsync=False)
+    return run
+
+
+def bench_naive_search(files, queries):
+    # What search_files used to do per keystroke: read every file
+    def run():
+        for query in queries:
+            for path in files:
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    query in f.read().lower()
+    return run
+
+
+def bench_index_search(index, files, matchers):
+    def run():
+        for matcher in matchers:
+            index.search(matcher, files)
+    return run
+
+
+def run_benchmarks(root, files, repeat):
+    results = {}
+
+    scanner = FolderScanner(root)
+    results["scan_full"] = measure(lambda: FolderScanner(root).scan(), repeat)
+    scanner.scan()
+    results["scan_rescan_unchanged"] = measure(scanner.rescan, repeat)
+
+    results["load_eager"] = measure(bench_load(files, False), repeat)
+    results["load_lazy"] = measure(bench_load(files, True), repeat)
+
+    # Keys come from separate ConfigFiles: building key_map on the timed ones would
+    # skip the buffer search find_key does on a first lookup
+    keys = []
+    for path in files:
+        config = ConfigFile()
+        config.load(path)
+        keys.append(list(config.key_map)[::5])
+    configs = []
+    setup = load_configs(files, configs)
+    results["get_value"] = measure(bench_get_value(configs, keys), repeat, setup)
+    results["update_value"] = measure(bench_update_value(configs, keys), repeat, setup)
+    results["save_one_change"] = measure(bench_save(files), repeat)
+
+    results["search_naive_read"] = measure(bench_naive_search(files, QUERIES), repeat)
+    index = SearchIndex()
+    results["search_index_build"] = measure(lambda: index.build(files), repeat)
+    results["search_index_query"] = measure(bench_index_search(index, files, [Matcher(q) for q in QUERIES]), repeat)
+    results["search_regex_query"] = measure(bench_index_search(index, files, [Matcher(q, MODE_REGEX) for q in REGEX_QUERIES]), repeat)
+    results["search_key_query"] = measure(bench_index_search(index, files, [Matcher(q, MODE_KEY) for q in KEY_QUERIES]), repeat)
+    return results
+
+
+def compare(results, baseline):
+    print(f"{'benchmark':28} {'baseline':>12} {'current':>12} {'ratio':>8}", file=sys.stderr)
+    for name, current in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            continue
+        ratio = current["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        print(f"{name:28} {old['median_ms']:>10.2f}ms {current['median_ms']:>10.2f}ms {ratio:>7.2f}x", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark config parsing, scanning and search")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--comment-density", type=float, default=0.3)
+    parser.add_argument("--dirs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", help="Use (and keep) this folder instead of a temporary one")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    root = args.corpus or tempfile.mkdtemp(prefix="ini_bench_")
+    try:
+        files = generate_corpus(root, args.files, args.lines, args.comment_density, args.dirs, args.seed)
+        results = run_benchmarks(root, files, args.repeat)
+    finally:
+        if not args.corpus:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "files": args.files,
+            "lines": args.lines,
+            "comment_density": args.comment_density,
+            "dirs": args.dirs,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
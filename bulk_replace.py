@@ -0,0 +1,173 @@
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+from config_parser import ConfigFile, ConfigLine, copy_owner, decode_text, write_atomic
+
+# Folder-wide find and replace over keys and/or values.
+# preview_folder() parses files in parallel (in chunks, reporting progress) and returns
+# every line that would change without touching the disk. apply_changes() then writes
+# all files as one transaction: each file is re-checked against its preview stat, new
+# contents are staged next to the originals with only the changed lines re-encoded,
+# and the staged files are renamed into place. If any step fails the files already
+# replaced are restored from their original bytes.
+
+TARGET_KEYS = 'keys'
+TARGET_VALUES = 'values'
+TARGET_BOTH = 'both'
+
+CHUNK_FILES = 32 # Files per preview batch between progress reports / cancellation checks
+
+
+class ReplaceError(Exception):
+    pass
+
+
+class LineChange:
+    __slots__ = ('line_num', 'old_key', 'new_key', 'old_value', 'new_value')
+
+    def __init__(self, line_num, old_key, new_key, old_value, new_value):
+        self.line_num = line_num
+        self.old_key = old_key
+        self.new_key = new_key
+        self.old_value = old_value
+        self.new_value = new_value
+
+
+class FileChanges:
+    def __init__(self, path, stat_key):
+        self.path = path
+        self.stat_key = stat_key # (mtime_ns, size) when previewed
+        self.changes = []
+        self.error = None
+
+
+class Replacer:
+    def __init__(self, find, replace, regex=False, ignore_case=False, target=TARGET_VALUES):
+        self.find = find
+        self.replace = replace
+        self.regex = regex
+        self.target = target
+        flags = re.IGNORECASE if ignore_case else 0
+        # Raises re.error for a bad pattern
+        self.pattern = re.compile(find if regex else re.escape(find), flags)
+        if not regex:
+            # Literal replacement: no backslash or group processing
+            self.replacement = lambda m: replace
+        else:
+            self.replacement = replace
+            self.pattern.sub(replace, "") # The template is checked even without a match
+
+    def apply(self, key, value):
+        # Returns the (key, value) pair after replacement
+        if self.target != TARGET_VALUES:
+            key = self.pattern.sub(self.replacement, key).strip()
+        if self.target != TARGET_KEYS:
+            value = self.pattern.sub(self.replacement, value)
+        return key, value
+
+    def preview_file(self, path):
+        st = os.stat(path)
+        result = FileChanges(path, (st.st_mtime_ns, st.st_size))
+        try:
+            if not self.regex:
+                # Cheap pre-check on the raw text; most files don't contain the search text
+                with open(path, 'rb') as f:
+                    if not self.pattern.search(decode_text(f.read())):
+                        return result
+            config = ConfigFile()
+            config.load(path, lazy=False)
+            for line in config.lines:
+                if line.type != ConfigLine.TYPE_KEY_VALUE:
+                    continue
+                key, value = self.apply(line.key, line.value)
+                if (key, value) != (line.key, line.value) and key and '=' not in key:
+                    result.changes.append(LineChange(line.line_num, line.key, key, line.value, value))
+        except Exception as e:
+            result.error = str(e)
+        return result
+
+
+def preview_folder(files, replacer, max_workers=8, progress=None, check_cancelled=None):
+    # Returns FileChanges for files with changes or errors, in file order.
+    # progress(done, total) is called after every chunk; check_cancelled may raise to stop.
+    results = []
+    with profiling.span("replace_preview", files=len(files)) as info:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for start in range(0, len(files), CHUNK_FILES):
+                if check_cancelled:
+                    check_cancelled()
+                chunk = files[start:start + CHUNK_FILES]
+                for result in pool.map(replacer.preview_file, chunk):
+                    if result.changes or result.error:
+                        results.append(result)
+                if progress:
+                    progress(min(start + CHUNK_FILES, len(files)), len(files))
+        info["files_changed"] = len(results)
+        info["lines"] = sum(len(r.changes) for r in results)
+    return results
+
+
+def stage_file(file_changes, fsync):
+    # Returns (original bytes, staged path); the original file is untouched
+    path = file_changes.path
+    st = os.stat(path)
+    if (st.st_mtime_ns, st.st_size) != file_changes.stat_key:
+        raise ReplaceError(f"{path} changed on disk since the preview")
+    with open(path, 'rb') as f:
+        original = f.read()
+    config = ConfigFile()
+    config.load(path, lazy=False)
+    for change in file_changes.changes:
+        line = config.lines[change.line_num]
+        if line.type != ConfigLine.TYPE_KEY_VALUE or line.key != change.old_key or line.value != change.old_value:
+            raise ReplaceError(f"{path}:{change.line_num + 1} no longer matches the preview")
+        if change.new_key != change.old_key:
+            config.rename_key(change.line_num, change.new_key)
+        config.update_line(change.line_num, change.new_value)
+    # Staged next to the real file, so a symlinked config is replaced where it lives
+    real_path = os.path.realpath(path)
+    staged = os.path.join(os.path.dirname(real_path), '.' + os.path.basename(real_path) + '.replace')
+    config.save(staged, fsync=fsync)
+    return original, staged
+
+
+def apply_changes(results, fsync=True, progress=None):
+    # Writes every previewed change or none of them. Returns the list of paths written.
+    results = [r for r in results if r.changes and not r.error]
+    staged = [] # (path, original bytes, staged path)
+    replaced = [] # (path, original bytes)
+    with profiling.span("replace_apply", files=len(results)):
+        try:
+            for i, file_changes in enumerate(results):
+                original, staged_path = stage_file(file_changes, fsync)
+                staged.append((file_changes.path, original, staged_path))
+                if progress:
+                    progress(i + 1, len(results))
+            for path, original, staged_path in staged:
+                real_path = os.path.realpath(path)
+                shutil.copymode(real_path, staged_path)
+                copy_owner(real_path, staged_path)
+                os.replace(staged_path, real_path)
+                replaced.append((path, original))
+        except BaseException:
+            rollback(replaced)
+            raise
+        finally:
+            for path, original, staged_path in staged:
+                if os.path.exists(staged_path):
+                    try:
+                        os.remove(staged_path)
+                    except OSError:
+                        pass
+    return [path for path, original in replaced]
+
+
+def rollback(replaced):
+    for path, original in replaced:
+        try:
+            write_atomic(path, lambda f, data=original: f.write(data))
+        except OSError as e:
+            print(f"Rollback failed for {path}: {e}")
@@ -0,0 +1,215 @@
+import argparse
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import bulk_replace
+import schema
+from config_parser import ConfigFile, ConfigLine
+
+# Headless bulk operations over a tree of config files, e.g.
+#   python main.py set C:/servers MaxConnections 500 --apply
+#   python main.py get C:/servers Port --glob "*/config.ini"
+#   python main.py validate C:/servers -q
+
+DEFAULT_GLOB = os.path.join("**", "*.ini")
+
+
+def find_files(root, pattern):
+    return sorted(glob.glob(os.path.join(root, pattern), recursive=True))
+
+
+def load(path):
+    config = ConfigFile()
+    config.load(path)
+    return config
+
+
+# Per-file workers. They run in a thread or process pool and return
+# (path, ok, lines) so the results can be printed in file order.
+
+def get_worker(path, key):
+    config = load(path)
+    value = config.get_value(key)
+    if value is None:
+        return path, False, [f"{key} not set"]
+    return path, True, [f"{key} = {value}"]
+
+
+def set_worker(path, key, value, apply):
+    config = load(path)
+    old = config.get_value(key)
+    if old is None:
+        return path, False, [f"{key} not set, skipped"]
+    if old == value:
+        return path, True, [f"{key} already {value}"]
+    if apply:
+        config.update_value(key, value)
+        config.save()
+        return path, True, [f"{key}: {old} -> {value}"]
+    return path, True, [f"{key}: {old} -> {value} (dry run)"]
+
+
+def list_worker(path, show_keys):
+    config = load(path)
+    if not show_keys:
+        return path, True, [f"{len(config.key_map)} keys"]
+    return path, True, [f"{line.key} = {line.value}" for line in config.key_map.values()]
+
+
+def grep_worker(path, pattern, ignore_case):
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    config = load(path)
+    found = []
+    for line in config.lines:
+        if line.type != ConfigLine.TYPE_KEY_VALUE:
+            continue
+        text = f"{line.key} = {line.value}"
+        if regex.search(text):
+            found.append(f"{line.line_num + 1}: {text}")
+    return path, bool(found), found
+
+
+def validate_worker(path):
+    # Like grep, a file "matches" when it has invalid values
+    problems = schema.get_schema().validate_file(load(path))
+    return path, bool(problems), [f"{line_num + 1}: {key} = {value}  ({message})" for line_num, key, value, message in problems]
+
+
+def run_parallel(func, files, args, jobs, processes):
+    executor_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_cls(max_workers=jobs) as pool:
+        futures = [pool.submit(func, path, *args) for path in files]
+        for path, future in zip(files, futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield path, None, [f"error: {e}"]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="EndlessINIEditor", description="Bulk get/set/list/grep over config files without the GUI.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("root", help="Root folder to search")
+    common.add_argument("--glob", default=DEFAULT_GLOB, help=f"File pattern relative to root (default: {DEFAULT_GLOB})")
+    common.add_argument("--jobs", "-j", type=int, default=None, help="Number of parallel workers")
+    common.add_argument("--processes", action="store_true", help="Use a process pool instead of threads")
+    common.add_argument("--quiet", "-q", action="store_true", help="Only print files that matched / changed")
+
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("get", parents=[common], help="Print a key's value in every file")
+    p.add_argument("key")
+
+    p = sub.add_parser("set", parents=[common], help="Set a key in every file that defines it (dry run unless --apply)")
+    p.add_argument("key")
+    p.add_argument("value")
+    p.add_argument("--apply", action="store_true", help="Actually write the changes")
+
+    p = sub.add_parser("list", parents=[common], help="List matching files")
+    p.add_argument("--keys", action="store_true", help="Also print every key/value")
+
+    p = sub.add_parser("grep", parents=[common], help="Search key/value lines with a regex")
+    p.add_argument("pattern")
+    p.add_argument("--ignore-case", "-i", action="store_true")
+
+    p = sub.add_parser("validate", parents=[common], help="Check values of known keys against their types (see schema.py)")
+
+    p = sub.add_parser("replace", parents=[common], help="Find and replace in keys and/or values (dry run unless --apply)")
+    p.add_argument("find")
+    p.add_argument("replacement")
+    p.add_argument("--regex", action="store_true", help="FIND is a regex; REPLACEMENT may use \\1 groups")
+    p.add_argument("--ignore-case", "-i", action="store_true")
+    p.add_argument("--target", choices=[bulk_replace.TARGET_VALUES, bulk_replace.TARGET_KEYS, bulk_replace.TARGET_BOTH],
+                   default=bulk_replace.TARGET_VALUES)
+    p.add_argument("--apply", action="store_true", help="Write all changes (all files or none)")
+
+    return parser
+
+
+def replace_command(args, files):
+    try:
+        replacer = bulk_replace.Replacer(args.find, args.replacement, args.regex, args.ignore_case, args.target)
+    except re.error as e:
+        print(f"Bad pattern: {e}", file=sys.stderr)
+        return 2
+    results = bulk_replace.preview_folder(files, replacer, max_workers=args.jobs or 8)
+
+    errors = 0
+    for result in results:
+        rel_path = os.path.relpath(result.path, args.root)
+        if result.error:
+            errors += 1
+            print(f"{rel_path}: error: {result.error}")
+            continue
+        for change in result.changes:
+            print(f"{rel_path}:{change.line_num + 1}: {change.old_key} = {change.old_value}  ->  {change.new_key} = {change.new_value}")
+
+    changed = [r for r in results if r.changes and not r.error]
+    lines = sum(len(r.changes) for r in changed)
+    if args.apply and changed:
+        if errors:
+            print("Not applying: some files could not be read", file=sys.stderr)
+            return 1
+        try:
+            bulk_replace.apply_changes(changed)
+        except Exception as e:
+            print(f"Nothing written, rolled back: {e}", file=sys.stderr)
+            return 1
+    summary = f"{len(files)} files, {len(changed)} to change ({lines} lines), {errors} errors"
+    if not args.apply:
+        summary += " (dry run, use --apply to write)"
+    print(summary, file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    files = find_files(args.root, args.glob)
+    if not files:
+        print(f"No files match {args.glob} under {args.root}")
+        return 1
+
+    if args.command == "replace":
+        return replace_command(args, files)
+
+    if args.command == "get":
+        func, func_args = get_worker, (args.key,)
+    elif args.command == "set":
+        func, func_args = set_worker, (args.key, args.value, args.apply)
+    elif args.command == "list":
+        func, func_args = list_worker, (args.keys,)
+    elif args.command == "validate":
+        func, func_args = validate_worker, ()
+    else:
+        func, func_args = grep_worker, (args.pattern, args.ignore_case)
+
+    errors = 0
+    matched = 0
+    for path, ok, lines in run_parallel(func, files, func_args, args.jobs, args.processes):
+        if ok is None:
+            errors += 1
+        elif ok:
+            matched += 1
+        elif args.quiet:
+            continue
+        rel_path = os.path.relpath(path, args.root)
+        for line in lines:
+            print(f"{rel_path}: {line}")
+
+    if args.command == "validate":
+        print(f"{len(files)} files, {matched} invalid, {errors} errors", file=sys.stderr)
+        return 1 if errors or matched else 0
+
+    summary = f"{len(files)} files, {matched} matched, {errors} errors"
+    if args.command == "set" and not args.apply:
+        summary += " (dry run, use --apply to write)"
+    print(summary, file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
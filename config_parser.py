@@ -1,95 +1,488 @@
+import bisect
 import re
+import os
+import mmap
+import shutil
+import tempfile
+import threading
+from array import array
+
+import profiling
+
+# Splits a key/value line into indent, key, separator, value and trailing whitespace
+# (the trailing part includes the original line ending)
+KEY_VALUE_PARTS = re.compile(rb'^(\s*)(.*?)(\s*=[ \t]*)(.*?)(\s*)$', re.DOTALL)
+
+COPY_CHUNK = 1024 * 1024
+NON_ASCII = re.compile(rb'[\x80-\xff]')
+ENCODING_SAMPLE = 64 * 1024 # Bytes past the first non-ASCII byte that a lazy load checks
+
+def detect_encoding(data):
+    # UTF-8 when valid; otherwise the legacy Windows-1252 the old server configs use,
+    # and Latin-1 (which accepts any byte) for the few bytes cp1252 leaves undefined
+    if data.isascii():
+        return 'utf-8'
+    for encoding in ('utf-8', 'cp1252'):
+        try:
+            data.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            pass
+    return 'latin-1'
+
+def sample_encoding(buf):
+    # detect_encoding for a file too large to decode whole: judge from the whole lines
+    # around the first non-ASCII bytes, since everything before them is plain ASCII
+    match = NON_ASCII.search(buf)
+    if match is None:
+        return 'utf-8'
+    start = buf.rfind(b'\n', 0, match.start()) + 1
+    end = buf.find(b'\n', match.start() + ENCODING_SAMPLE)
+    if end == -1:
+        end = len(buf)
+    return detect_encoding(bytes(buf[start:end]))
+
+def decode_text(data, encoding=None):
+    return bytes(data).decode(encoding or detect_encoding(data))
+
+def encode_text(text, encoding):
+    # A character the line's encoding can't hold falls back to UTF-8 rather than being lost
+    try:
+        return text.encode(encoding)
+    except UnicodeEncodeError:
+        return text.encode('utf-8')
 
 class ConfigLine:
-    TYPE_COMMENT = 'COMMENT'
-    TYPE_KEY_VALUE = 'KEY_VALUE'
-    TYPE_WHITESPACE = 'WHITESPACE'
-    TYPE_UNKNOWN = 'UNKNOWN'
+    # Line types are small ints; TYPE_NAMES maps them back for display/debugging
+    TYPE_COMMENT = 0
+    TYPE_KEY_VALUE = 1
+    TYPE_WHITESPACE = 2
+    TYPE_UNKNOWN = 3
+    TYPE_NAMES = ('COMMENT', 'KEY_VALUE', 'WHITESPACE', 'UNKNOWN')
+
+    # No per-instance __dict__: big files create one of these per line.
+    # The line is kept as its original bytes; key and value hold bytes until first
+    # accessed and are decoded then, so lines nobody looks at are never decoded.
+    __slots__ = ('raw', 'line_num', 'type', '_key', '_value', 'dirty')
 
-    def __init__(self, raw_line, line_num):
-        self.raw_line = raw_line
+    def __init__(self, raw, line_num):
+        if isinstance(raw, str):
+            raw = raw.encode('utf-8')
+        self.raw = raw # Original bytes, including the line ending
         self.line_num = line_num
-        self.type = self.determine_type(raw_line)
         self.key = None
-        self.value = None
-        self.comment = None
-        
-        if self.type == self.TYPE_KEY_VALUE:
-            self.parse_key_value()
-        elif self.type == self.TYPE_COMMENT:
-            self.comment = raw_line.strip()
-
-    def determine_type(self, line):
-        stripped = line.strip()
+        self._value = None
+        self.dirty = False # Set when the key or value changes; only dirty lines are rewritten on save
+
+        self.type = self.classify(raw)
+
+    def classify(self, raw):
+        # Works on the bytes: a key/value line has a non-empty key, not starting
+        # with '#', before its first '='
+        stripped = raw.strip()
         if not stripped:
             return self.TYPE_WHITESPACE
-        if stripped.startswith('#'):
+        if stripped.startswith(b'#'):
             return self.TYPE_COMMENT
-        if '=' in stripped:
-            # Check if it looks like a key=value pair
-            # We assume keys don't start with # and exist before the first =
-            parts = stripped.split('=', 1)
-            if parts[0].strip():
+        key, sep, value = stripped.partition(b'=')
+        if sep and key:
+            key = key.rstrip()
+            if key:
+                self._key = key
+                self._value = value.lstrip()
                 return self.TYPE_KEY_VALUE
         return self.TYPE_UNKNOWN
 
-    def parse_key_value(self):
-        parts = self.raw_line.split('=', 1)
-        self.key = parts[0].strip()
-        # Value might have an inline comment, though in these files comments seem to be mostly on separate lines
-        # But let's check for "Key = Value # Comment" just in case, although strictly speaking 
-        # in some INI formats # inside value is valid. 
-        # Based on observed files, value is just the rest of the line.
-        val_part = parts[1].strip()
-        self.value = val_part
-    
+    @property
+    def encoding(self):
+        return detect_encoding(self.raw)
+
+    @property
+    def raw_line(self):
+        # Decoded text of the line, with CRLF normalized to LF
+        text = decode_text(self.raw)
+        if text.endswith('\r\n'):
+            text = text[:-2] + '\n'
+        return text
+
+    @property
+    def key(self):
+        if type(self._key) is bytes:
+            self._key = decode_text(self._key, self.encoding)
+        return self._key
+
+    @key.setter
+    def key(self, new_key):
+        self._key = new_key
+
+    @property
+    def value(self):
+        if type(self._value) is bytes:
+            self._value = decode_text(self._value, self.encoding)
+        return self._value
+
+    @value.setter
+    def value(self, new_value):
+        if new_value != self.value:
+            self._value = new_value
+            self.dirty = True
+
+    @property
+    def comment(self):
+        # Derived from the raw bytes instead of storing a second copy of the text
+        if self.type == self.TYPE_COMMENT:
+            return self.raw_line.strip()
+        return None
+
+    @property
+    def type_name(self):
+        return self.TYPE_NAMES[self.type]
+
+    def to_bytes(self, default_encoding='utf-8'):
+        if self.type != self.TYPE_KEY_VALUE or not self.dirty:
+            return self.raw
+        # Swap in the new key/value but keep the original indentation, spacing and line ending.
+        # Re-encode in the line's own encoding; pure ASCII lines take the file's.
+        encoding = default_encoding if self.raw.isascii() else self.encoding
+        match = KEY_VALUE_PARTS.match(self.raw)
+        indent, key, sep, old_value, trailing = match.groups()
+        if not old_value and not sep.endswith((b' ', b'\t')):
+            sep += b' '
+        if not trailing.endswith(b'\n') and self.raw.endswith(b'\n'):
+            trailing += b'\n'
+        return indent + encode_text(self.key, encoding) + sep + encode_text(self.value, encoding) + trailing
+
     def to_string(self):
-        if self.type == self.TYPE_KEY_VALUE:
-            # Reconstruct trying to preserve some original formatting if possible?
-            # For now, standard "Key = Value" is likely fine, but let's try to match original indentation if we wanted to be perfect.
-            # However, simpler is better for now.
-            return f"{self.key} = {self.value}\n"
-        else:
-            return self.raw_line
+        return decode_text(self.to_bytes())
+
+    def revert(self):
+        # Back to the key and value of the original bytes, dropping unsaved changes
+        self.type = self.classify(self.raw)
+        self.dirty = False
+
+def line_offsets(buf):
+    # Start offset of every line, plus one final end offset
+    offsets = array('Q', [0])
+    pos = buf.find(b'\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = buf.find(b'\n', pos + 1)
+    if offsets[-1] != len(buf):
+        offsets.append(len(buf)) # Last line has no trailing newline
+    return offsets
+
+def line_at_offset(offsets, offset):
+    # Binary search for the line containing a byte offset
+    return bisect.bisect_right(offsets, offset, 0, len(offsets) - 1) - 1
+
+def copy_owner(src, dst):
+    # Keep the file's owner and group where the OS allows it (e.g. running as root)
+    if not hasattr(os, 'chown'):
+        return
+    try:
+        st = os.stat(src)
+        os.chown(dst, st.st_uid, st.st_gid)
+    except OSError:
+        pass
+
+def write_atomic(target, write, fsync=True, before_replace=None):
+    # Write through a temp file in the same directory, then rename over the target,
+    # so a crash mid-save leaves either the old or the new file, never a partial one.
+    # A symlinked target is resolved first: the rename replaces the file it points to,
+    # not the link.
+    target = os.path.realpath(target)
+    directory = os.path.dirname(os.path.abspath(target))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(target) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        if os.path.exists(target):
+            shutil.copymode(target, tmp_path)
+            copy_owner(target, tmp_path)
+        if before_replace:
+            before_replace()
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class LazyLines:
+    # Sequence of ConfigLine objects backed by a memory-mapped file.
+    # Only line start offsets are kept up front; a ConfigLine is parsed the first
+    # time its line is accessed. Reads of the map hold the file's lock, because a
+    # background save swaps the map for the new file's.
+
+    def __init__(self, buf, offsets, lock):
+        self.buf = buf
+        self.offsets = offsets # Start offset of every line, plus one final end offset
+        self.lock = lock
+        self.parsed = {} # Maps line number to its parsed ConfigLine
+
+    def read_line(self, index):
+        with self.lock:
+            return ConfigLine(self.buf[self.offsets[index]:self.offsets[index + 1]], index)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        line_obj = self.parsed.get(index)
+        if line_obj is None:
+            line_obj = self.parsed.setdefault(index, self.read_line(index))
+        return line_obj
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def peek(self, index):
+        # The line without keeping it: a line not parsed yet comes back as a throwaway
+        # ConfigLine, so one pass over a huge file doesn't hold every line in memory
+        line_obj = self.parsed.get(index)
+        if line_obj is None:
+            line_obj = self.read_line(index)
+        return line_obj
 
 class ConfigFile:
+    # Files at least this big are opened lazily unless load() is told otherwise
+    LAZY_THRESHOLD = 4 * 1024 * 1024
+
     def __init__(self, filepath=None):
         self.filepath = filepath
         self.lines = []
-        self.key_map = {} # Maps key string to list of ConfigLine objects (indices or references)
+        self._key_map = {} # Maps key string to its (last) ConfigLine
+        self.lazy = False
+        self._mmap = None
+        self._buf = None # Original file contents (bytes, or the mmap in lazy mode)
+        self._offsets = None # Byte offset of every line in _buf
+        self._key_map_complete = True
+        self.encoding = 'utf-8' # Used for edited lines that were pure ASCII before
+        # Held while a save of a mapped file closes, replaces and re-maps it; code that
+        # reads _buf of a lazily loaded file from another thread takes it as well
+        self.lock = threading.RLock()
 
-    def load(self, filepath):
+    def load(self, filepath, lazy=None):
+        self.close()
         self.filepath = filepath
         self.lines = []
-        self.key_map = {}
-        
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-            raw_lines = f.readlines()
-            
-        for i, raw in enumerate(raw_lines):
-            line_obj = ConfigLine(raw, i)
-            self.lines.append(line_obj)
-            
-            if line_obj.type == ConfigLine.TYPE_KEY_VALUE:
-                self.key_map[line_obj.key] = line_obj
+        self._key_map = {}
+        self._key_map_complete = False # Built on first use, which decodes every key
+        self.encoding = 'utf-8'
+
+        if lazy is None:
+            lazy = os.path.getsize(filepath) >= self.LAZY_THRESHOLD
+        self.lazy = lazy
+        with profiling.span("load", path=filepath, lazy=lazy):
+            if lazy:
+                self.load_lazy(filepath)
+            else:
+                self.load_eager(filepath)
+
+    def load_eager(self, filepath):
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        self._buf = data
+        self._offsets = offsets = line_offsets(data)
+        self.encoding = detect_encoding(data)
+        # Lines are classified on their bytes; nothing is decoded until it is used
+        self.lines = [ConfigLine(data[offsets[i]:offsets[i + 1]], i) for i in range(len(offsets) - 1)]
+
+    def load_lazy(self, filepath):
+        self.map_file(filepath)
+        self.encoding = sample_encoding(self._buf)
+        self.lines = LazyLines(self._buf, self._offsets, self.lock)
+
+    def map_file(self, filepath):
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._buf = self._mmap
+            else:
+                self._buf = b''
+        # Single pass over the buffer to find where each line starts
+        self._offsets = line_offsets(self._buf)
+
+    def close(self):
+        # Release the memory map of a lazily loaded file
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._buf = None
+
+    @property
+    def key_map(self):
+        if not self._key_map_complete:
+            self._key_map = {}
+            for line_obj in self.lines:
+                if line_obj.type == ConfigLine.TYPE_KEY_VALUE:
+                    self._key_map[line_obj.key] = line_obj
+            self._key_map_complete = True
+        return self._key_map
+
+    def find_key(self, key):
+        # Cached hits and misses are answered without touching any other line
+        if key in self._key_map:
+            return self._key_map[key]
+        if self._key_map_complete or self._buf is None:
+            return self.key_map.get(key)
+
+        # Search the raw buffer and decode only the matching line, instead of every key.
+        # The last definition wins, same as a fully built key_map.
+        pattern = re.compile(rb'^[ \t]*' + re.escape(encode_text(key, self.encoding)) + rb'[ \t]*=', re.MULTILINE)
+        found = None
+        with self.lock:
+            for match in pattern.finditer(self._buf):
+                line_obj = self.lines[line_at_offset(self._offsets, match.start())]
+                if line_obj.type == ConfigLine.TYPE_KEY_VALUE and line_obj.key == key:
+                    found = line_obj
+        self._key_map[key] = found
+        return found
 
     def get_value(self, key):
-        if key in self.key_map:
-            return self.key_map[key].value
+        line_obj = self.find_key(key)
+        if line_obj is not None:
+            return line_obj.value
         return None
 
     def update_value(self, key, new_value):
-        if key in self.key_map:
-            line_obj = self.key_map[key]
+        line_obj = self.find_key(key)
+        if line_obj is not None:
             line_obj.value = new_value
             return True
         return False
 
-    def save(self, filepath=None):
+    def update_line(self, line_num, new_value):
+        # Update a specific key/value line, even if its key appears more than once
+        line_obj = self.lines[line_num]
+        if line_obj.type != ConfigLine.TYPE_KEY_VALUE or line_obj.value == new_value:
+            return False
+        line_obj.value = new_value
+        return True
+
+    def rename_key(self, line_num, new_key):
+        # Rename the key of one key/value line; the line is rewritten on save
+        line_obj = self.lines[line_num]
+        if line_obj.type != ConfigLine.TYPE_KEY_VALUE or line_obj.key == new_key:
+            return False
+        if self._key_map.get(line_obj.key) is line_obj:
+            del self._key_map[line_obj.key]
+        line_obj.key = new_key
+        line_obj.dirty = True
+        # Recorded even while the map is partial: the buffer search can't see unsaved keys
+        self._key_map[new_key] = line_obj
+        return True
+
+    def text(self):
+        # Whole file contents as last loaded or saved
+        with self.lock:
+            if self._buf is None:
+                return ''.join(line.to_string() for line in self.lines)
+            return decode_text(self._buf[:])
+
+    def dirty_lines(self):
+        if self.lazy:
+            # Untouched lines were never parsed, so they can't be dirty
+            return [self.lines.parsed[i] for i in sorted(self.lines.parsed) if self.lines.parsed[i].dirty]
+        return [line for line in self.lines if line.dirty]
+
+    def is_dirty(self):
+        return bool(self.dirty_lines())
+
+    def revert_unsaved(self):
+        # Undo changes that never reached the disk (e.g. after a failed save), so the
+        # model matches the file again. Renamed keys invalidate the key map.
+        reverted = self.dirty_lines()
+        for line_obj in reverted:
+            line_obj.revert()
+        if reverted:
+            self._key_map = {}
+            self._key_map_complete = False
+        return len(reverted)
+
+    def patched_line(self, line_obj):
+        # Re-encode a rewritten line in its original encoding, keeping its line ending bytes
+        return line_obj.to_bytes(self.encoding)
+
+    def span(self, start, end):
+        # Original bytes in [start, end), in bounded chunks so mapped files aren't copied whole
+        while start < end:
+            stop = min(start + COPY_CHUNK, end)
+            yield self._buf[start:stop]
+            start = stop
+
+    def save(self, filepath=None, fsync=True):
         target = filepath if filepath else self.filepath
         if not target:
             raise ValueError("No filepath specified for save")
-            
-        with open(target, 'w', encoding='utf-8') as f:
-            for line in self.lines:
-                f.write(line.to_string())
+        with profiling.span("save", path=target):
+            self.write(target, fsync)
+
+    def write(self, target, fsync):
+        if self._buf is None:
+            # Not loaded from disk: nothing to patch against, write every line
+            data = b''.join(line.to_bytes(self.encoding) for line in self.lines)
+            write_atomic(target, lambda f: f.write(data), fsync)
+            return
+
+        # Copy untouched byte ranges straight from the original buffer and only
+        # re-encode the lines whose values changed
+        patches = [(line_obj, self.patched_line(line_obj)) for line_obj in self.dirty_lines()]
+        same_file = self.filepath is not None and os.path.abspath(target) == os.path.abspath(self.filepath)
+
+        def pieces():
+            pos = 0
+            for line_obj, data in patches:
+                yield from self.span(pos, self._offsets[line_obj.line_num])
+                yield data
+                pos = self._offsets[line_obj.line_num + 1]
+            yield from self.span(pos, len(self._buf))
+
+        if self.lazy:
+            def write(f):
+                for piece in pieces():
+                    f.write(piece)
+            held = []
+
+            def release():
+                # The old mapping has to be released before the rename (required on Windows).
+                # Readers on other threads wait from here until the new file is mapped.
+                self.lock.acquire()
+                held.append(True)
+                self.close()
+
+            try:
+                write_atomic(target, write, fsync, before_replace=release if same_file else None)
+            finally:
+                try:
+                    with self.lock:
+                        if self._mmap is None and same_file:
+                            self.map_file(self.filepath)
+                            self.lines.buf = self._buf
+                            self.lines.offsets = self._offsets
+                finally:
+                    if held:
+                        self.lock.release()
+        else:
+            new_data = b''.join(pieces())
+            write_atomic(target, lambda f: f.write(new_data), fsync)
+            if same_file:
+                self._buf = new_data
+                self._offsets = line_offsets(new_data)
+
+        if same_file:
+            # The file on disk now matches the model, so these lines are clean again
+            for line_obj, data in patches:
+                line_obj.raw = data
+                line_obj.dirty = False
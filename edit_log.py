@@ -0,0 +1,96 @@
+import sys
+import time
+from collections import deque
+
+# Undo/redo history for one file.
+# Every operation is a (line index, old value, new value) tuple. Keystrokes on the same
+# line in quick succession are merged into one operation, and the oldest operations
+# are dropped once the log exceeds its memory budget. The log also keeps the net
+# result of all operations as `edits` (line index -> unsaved value), which is what
+# a save writes; a value equal to the saved one is not an edit.
+
+DEFAULT_BUDGET_BYTES = 256 * 1024
+MERGE_SECONDS = 1.0
+OP_OVERHEAD = 72 # Approximate size of the tuple and int of one operation
+
+
+def op_size(op):
+    return OP_OVERHEAD + sys.getsizeof(op[1]) + sys.getsizeof(op[2])
+
+
+class EditLog:
+    def __init__(self, saved_value, stat_key=None, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.saved_value = saved_value # saved_value(line index) -> value currently on disk
+        self.stat_key = stat_key # (mtime_ns, size) of the file these line indices refer to
+        self.budget_bytes = budget_bytes
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.size = 0 # Estimated bytes held by both stacks
+        self.last_time = 0.0 # When the newest operation was recorded, for merging
+        self.edits = {}
+
+    def set_value(self, line_index, value):
+        if value == self.saved_value(line_index):
+            self.edits.pop(line_index, None)
+        else:
+            self.edits[line_index] = value
+
+    def record(self, line_index, old, new):
+        now = time.monotonic()
+        self.set_value(line_index, new)
+        self.clear_redo()
+
+        top = self.undo_stack[-1] if self.undo_stack else None
+        if top is not None and top[0] == line_index and now - self.last_time < MERGE_SECONDS:
+            # Same line, still typing: extend the previous operation
+            self.undo_stack.pop()
+            self.size -= op_size(top)
+            if top[1] != new:
+                self.push((line_index, top[1], new))
+        else:
+            self.push((line_index, old, new))
+        self.last_time = now
+
+    def push(self, op):
+        self.undo_stack.append(op)
+        self.size += op_size(op)
+        while self.size > self.budget_bytes and self.undo_stack:
+            self.size -= op_size(self.undo_stack.popleft())
+
+    def clear_redo(self):
+        for op in self.redo_stack:
+            self.size -= op_size(op)
+        self.redo_stack = []
+
+    def undo(self):
+        # Returns (line index, restored value), or None if there is nothing to undo
+        if not self.undo_stack:
+            return None
+        op = self.undo_stack.pop()
+        self.redo_stack.append(op)
+        self.last_time = 0.0 # Typing after an undo starts a new operation
+        self.set_value(op[0], op[1])
+        return op[0], op[1]
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        op = self.redo_stack.pop()
+        self.undo_stack.append(op)
+        self.last_time = 0.0
+        self.set_value(op[0], op[2])
+        return op[0], op[2]
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def mark_saved(self, saved_edits, stat_key=None):
+        # The values in saved_edits reached the disk; anything typed since stays pending
+        for line_index, value in saved_edits.items():
+            if self.edits.get(line_index) == value:
+                del self.edits[line_index]
+        if stat_key is not None:
+            self.stat_key = stat_key
@@ -0,0 +1,99 @@
+import os
+import threading
+from collections import OrderedDict
+
+from config_parser import ConfigFile
+
+# Process-wide LRU cache of parsed ConfigFile models.
+# Entries are keyed by path and validated against (mtime_ns, size), so a file that
+# changed on disk is simply re-parsed. Lazily loaded (very large) files hold a memory
+# map and are not cached.
+
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024 # Source bytes; parsed models take several times that
+
+
+class ParsedFileCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict() # Maps path to (stat key, ConfigFile, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def stat_key(self, path):
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+
+    def peek(self, path):
+        # Cached model if it is still fresh, without loading anything
+        try:
+            key = self.stat_key(path)
+        except OSError:
+            return None
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def get(self, path):
+        key = self.stat_key(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Parse outside the lock so other threads aren't held up
+        config = ConfigFile()
+        config.load(path)
+        if not config.lazy:
+            self.store(path, key, config)
+        return config
+
+    def put(self, path, config):
+        # Re-register a model after it was saved, so the new mtime/size maps to it
+        if config.lazy:
+            self.invalidate(path)
+            return
+        try:
+            key = self.stat_key(path)
+        except OSError:
+            self.invalidate(path)
+            return
+        self.store(path, key, config)
+
+    def store(self, path, key, config):
+        with self.lock:
+            self.remove(path)
+            size = key[1]
+            self.entries[path] = (key, config, size)
+            self.total_bytes += size
+            # Evict least recently used entries, but always keep the newest one
+            while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                old_path, old_entry = self.entries.popitem(last=False)
+                self.total_bytes -= old_entry[2]
+
+    def remove(self, path):
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def invalidate(self, path):
+        with self.lock:
+            self.remove(path)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+file_cache = ParsedFileCache()
@@ -0,0 +1,165 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+# Directories that never contain server configs worth editing
+IGNORED_DIRS = {'__pycache__', 'node_modules', 'venv'}
+
+
+class FolderScanner:
+    # Finds config files under a root with os.scandir.
+    # Every directory's mtime is remembered together with its file and subdirectory
+    # listing; a rescan only re-lists directories whose mtime changed and reuses the
+    # cached listing for the rest. Top-level subtrees are walked in parallel.
+    # Symlinked directories are followed like glob did; a directory already seen on the
+    # way (same device and inode) is skipped, so a link back up the tree can't loop.
+
+    def __init__(self, root, extension='.ini', ignored_dirs=None, max_workers=8):
+        self.root = root
+        self.extension = extension.lower()
+        self.ignored_dirs = IGNORED_DIRS if ignored_dirs is None else set(ignored_dirs)
+        self.max_workers = max_workers
+        self.dirs = {} # Maps directory path to (mtime_ns, files, subdirs)
+        self.files = []
+        self.last_rescanned = 0 # Number of directories re-listed by the last scan
+
+    def is_ignored(self, name):
+        # Like glob, skip hidden entries
+        return name.startswith('.') or name in self.ignored_dirs
+
+    def list_dir(self, path):
+        files = []
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if self.is_ignored(entry.name):
+                    continue
+                try:
+                    if entry.is_dir():
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(self.extension) and entry.is_file():
+                        files.append(entry.path)
+                except OSError:
+                    continue
+        return files, subdirs
+
+    def walk(self, top, old_dirs, seen=()):
+        # Walk one subtree, returning (dirs, files, rescanned_count).
+        # seen holds the identities of directories above top.
+        dirs = {}
+        files = []
+        rescanned = 0
+        visited = set(seen)
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue # Removed since it was listed
+            if st.st_ino: # 0 where the filesystem has no inode numbers
+                identity = (st.st_dev, st.st_ino)
+                if identity in visited:
+                    continue
+                visited.add(identity)
+            mtime = st.st_mtime_ns
+            cached = old_dirs.get(path)
+            if cached is not None and cached[0] == mtime:
+                dir_files, subdirs = cached[1], cached[2]
+            else:
+                try:
+                    dir_files, subdirs = self.list_dir(path)
+                except OSError as e:
+                    print(f"Error scanning {path}: {e}")
+                    continue
+                rescanned += 1
+            dirs[path] = (mtime, dir_files, subdirs)
+            files.extend(dir_files)
+            stack.extend(subdirs)
+        return dirs, files, rescanned
+
+    def restore(self, dirs, files):
+        # Seed from a saved snapshot; the next rescan re-lists only directories that changed since
+        self.dirs = dirs
+        self.files = files
+
+    def scan(self):
+        # Full scan, ignoring anything recorded before
+        self.dirs = {}
+        return self.rescan()
+
+    def rescan(self):
+        with profiling.span("scan", root=self.root) as info:
+            files = self.rescan_dirs()
+            info["files"] = len(files)
+            info["rescanned"] = self.last_rescanned
+        return files
+
+    def rescan_dirs(self):
+        old_dirs = self.dirs
+
+        # The root itself is handled here so its subdirectories can be fanned out
+        root_dirs, root_files, rescanned = self.walk_root(old_dirs)
+        if root_dirs is None:
+            self.dirs = {}
+            self.files = []
+            self.last_rescanned = 0
+            return self.files
+
+        new_dirs = dict(root_dirs)
+        files = list(root_files)
+        subtrees = root_dirs[self.root][2]
+
+        if subtrees:
+            try:
+                st = os.stat(self.root)
+                seen = {(st.st_dev, st.st_ino)} if st.st_ino else set()
+            except OSError:
+                seen = set()
+            workers = min(self.max_workers, len(subtrees))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for dirs, sub_files, count in pool.map(lambda top: self.walk(top, old_dirs, seen), subtrees):
+                    new_dirs.update(dirs)
+                    files.extend(sub_files)
+                    rescanned += count
+
+        self.dirs = new_dirs
+        self.files = sorted(files)
+        self.last_rescanned = rescanned
+        return self.files
+
+    def walk_root(self, old_dirs):
+        try:
+            mtime = os.stat(self.root).st_mtime_ns
+        except OSError:
+            return None, [], 0
+        cached = old_dirs.get(self.root)
+        if cached is not None and cached[0] == mtime:
+            return {self.root: cached}, cached[1], 0
+        try:
+            files, subdirs = self.list_dir(self.root)
+        except OSError as e:
+            print(f"Error scanning {self.root}: {e}")
+            return None, [], 0
+        return {self.root: (mtime, files, subdirs)}, files, 1
+
+
+def scan_roots(scanners, max_workers=4):
+    # Rescans several workspace roots at once; returns their file lists in scanner order.
+    # Each scanner still fans its own subtrees out, so a large root doesn't hold up the others.
+    if not scanners:
+        return []
+
+    def rescan(scanner):
+        try:
+            return scanner.rescan()
+        except Exception as e:
+            print(f"Error scanning {scanner.root}: {e}")
+            return []
+
+    with profiling.span("scan_roots", roots=len(scanners)) as info:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(scanners))) as pool:
+            results = list(pool.map(rescan, scanners))
+        info["files"] = sum(len(files) for files in results)
+    return results
@@ -0,0 +1,105 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+from config_parser import ConfigFile
+from file_scanner import FolderScanner
+
+# Compares two install trees (e.g. staging vs production).
+# Files are paired by path relative to their root. Identical files are detected by
+# size + content hash without parsing; only files that differ are parsed and diffed
+# key by key using ConfigFile.key_map.
+
+STATUS_UNCHANGED = 'unchanged'
+STATUS_CHANGED = 'changed'
+STATUS_ADDED = 'added'     # Only in the right tree
+STATUS_REMOVED = 'removed' # Only in the left tree
+STATUS_ERROR = 'error'
+
+HASH_CHUNK = 1024 * 1024
+
+
+class FileDiff:
+    def __init__(self, rel_path, status):
+        self.rel_path = rel_path
+        self.status = status
+        self.added = {}   # key -> right value
+        self.removed = {} # key -> left value
+        self.changed = {} # key -> (left value, right value)
+        self.error = None
+
+    def key_change_count(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+
+def file_hash(path):
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def diff_keys(left_path, right_path, result):
+    left = ConfigFile()
+    left.load(left_path)
+    right = ConfigFile()
+    right.load(right_path)
+    left_map = left.key_map
+    right_map = right.key_map
+
+    for key, line in right_map.items():
+        if key not in left_map:
+            result.added[key] = line.value
+        elif left_map[key].value != line.value:
+            result.changed[key] = (left_map[key].value, line.value)
+    for key, line in left_map.items():
+        if key not in right_map:
+            result.removed[key] = line.value
+    left.close()
+    right.close()
+
+
+def compare_pair(rel_path, left_path, right_path):
+    result = FileDiff(rel_path, STATUS_UNCHANGED)
+    try:
+        if os.path.getsize(left_path) == os.path.getsize(right_path) and file_hash(left_path) == file_hash(right_path):
+            return result
+        diff_keys(left_path, right_path, result)
+        # Files can differ only in comments/whitespace; that still counts as changed
+        result.status = STATUS_CHANGED
+    except Exception as e:
+        result.status = STATUS_ERROR
+        result.error = str(e)
+    return result
+
+
+def relative_files(root):
+    return {os.path.relpath(path, root): path for path in FolderScanner(root).scan()}
+
+
+def compare_folders(left_root, right_root, max_workers=8, left_files=None, right_files=None):
+    # Returns FileDiff results sorted by relative path.
+    # Pre-scanned file lists (full paths) can be passed to skip scanning.
+    with profiling.span("compare", left=left_root, right=right_root) as info:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            left_future = pool.submit(relative_files, left_root) if left_files is None else None
+            right_future = pool.submit(relative_files, right_root) if right_files is None else None
+            left = left_future.result() if left_future else {os.path.relpath(p, left_root): p for p in left_files}
+            right = right_future.result() if right_future else {os.path.relpath(p, right_root): p for p in right_files}
+
+        results = []
+        for rel_path in left.keys() - right.keys():
+            results.append(FileDiff(rel_path, STATUS_REMOVED))
+        for rel_path in right.keys() - left.keys():
+            results.append(FileDiff(rel_path, STATUS_ADDED))
+
+        common = sorted(left.keys() & right.keys())
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results.extend(pool.map(lambda rel: compare_pair(rel, left[rel], right[rel]), common))
+
+        results.sort(key=lambda r: r.rel_path)
+        info["files"] = len(results)
+        info["changed"] = sum(1 for r in results if r.status == STATUS_CHANGED)
+    return results
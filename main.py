@@ -1,6 +1,18 @@
 import sys
 import os
 
+import profiling
+
+if __name__ == "__main__":
+    # --timings / --profile (or INI_EDITOR_TIMINGS / INI_EDITOR_PROFILE) work for GUI and CLI.
+    # --startup-time[=exit] prints how long the window took to draw and become usable.
+    profiling.configure(sys.argv)
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Any arguments mean headless batch mode; the GUI isn't needed (or imported)
+    import cli
+    sys.exit(cli.main())
+
 # Ensure dependencies are available (though likely installed in global or venv)
 try:
     import customtkinter
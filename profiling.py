@@ -0,0 +1,192 @@
+import time
+
+START_TIME = time.perf_counter() # Imported first by main.py: this is process start for startup timings
+
+import atexit
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Lightweight timing instrumentation.
+#
+# span("load", path=...) times a block. The latest timings are always kept in memory
+# (see last() / last_fields()); when timing logs are enabled every span is also written as
+# one JSON line to a rotating log so slow operations in the field can be diagnosed.
+#
+# Enable with environment variables or the matching command line flags:
+#   INI_EDITOR_TIMINGS=1 (or a path)   / --timings[=path]   -> timings.log
+#   INI_EDITOR_PROFILE=1 (or a path)   / --profile[=path]   -> cProfile dump on exit
+#   INI_EDITOR_STARTUP=1 (or "exit")   / --startup-time[=exit] -> print startup stages to
+#                                         stderr (and quit once the window is interactive)
+
+TIMINGS_FILE = 'timings.log'
+PROFILE_FILE = 'profile.prof'
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+LAST_BY_PATH_MAX = 256 # Per-file timings kept; the least recently recorded are dropped
+
+_lock = threading.Lock()
+_stats = {} # Maps span name to {"count", "total_ms", "max_ms", "last_ms", "last_fields"}
+_last_by_path = OrderedDict() # Maps (span name, path) to the last duration in ms, for spans with a path field
+_logger = None
+_profiler = None
+startup_mode = None # None, '1' (report) or 'exit' (report, then quit when interactive)
+
+
+def enable_timings(path=TIMINGS_FILE):
+    global _logger
+    if _logger is not None:
+        return
+    # Imported here so startup doesn't pay for logging unless it is used
+    import logging
+    import logging.handlers
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger = logging.getLogger('ini_editor.timings')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    _logger = logger
+
+
+def enable_profiler(path=PROFILE_FILE):
+    global _profiler
+    if _profiler is not None:
+        return
+    import cProfile
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+    def dump():
+        _profiler.disable()
+        _profiler.dump_stats(path)
+        print(f"Profile written to {path} (view with: python -m pstats {path})")
+    atexit.register(dump)
+
+
+def configure(argv=None):
+    # Reads the environment and strips --timings/--profile/--startup-time from argv (in place)
+    global startup_mode
+    timings = os.environ.get('INI_EDITOR_TIMINGS')
+    profile = os.environ.get('INI_EDITOR_PROFILE')
+    startup = os.environ.get('INI_EDITOR_STARTUP')
+
+    if argv is not None:
+        for arg in list(argv[1:]):
+            name, _, value = arg.partition('=')
+            if name == '--timings':
+                timings = value or '1'
+                argv.remove(arg)
+            elif name == '--profile':
+                profile = value or '1'
+                argv.remove(arg)
+            elif name == '--startup-time':
+                startup = value or '1'
+                argv.remove(arg)
+
+    if timings:
+        enable_timings(TIMINGS_FILE if timings == '1' else timings)
+    if profile:
+        enable_profiler(PROFILE_FILE if profile == '1' else profile)
+    if startup:
+        startup_mode = startup
+
+
+def record(name, duration_ms, **fields):
+    with _lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0, "last_fields": {}}
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        entry["last_ms"] = duration_ms
+        entry["last_fields"] = fields
+        if "path" in fields:
+            key = (name, fields["path"])
+            _last_by_path[key] = duration_ms
+            _last_by_path.move_to_end(key)
+            if len(_last_by_path) > LAST_BY_PATH_MAX:
+                _last_by_path.popitem(last=False)
+
+    if _logger is not None:
+        _logger.info(json.dumps({
+            "ts": round(time.time(), 3),
+            "span": name,
+            "ms": round(duration_ms, 3),
+            "thread": threading.current_thread().name,
+            **fields
+        }, default=str))
+
+
+@contextmanager
+def span(name, **fields):
+    # Extra fields can be added inside the block: with span("x") as info: info["files"] = 3
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        record(name, (time.perf_counter() - start) * 1000, **fields)
+
+
+def startup_mark(stage, **fields):
+    # Records "startup_<stage>" as the time since process start (e.g. first_frame, interactive)
+    elapsed_ms = (time.perf_counter() - START_TIME) * 1000
+    record("startup_" + stage, elapsed_ms, **fields)
+    if startup_mode:
+        print(f"startup {stage}: {elapsed_ms:.1f} ms", file=sys.stderr)
+    return elapsed_ms
+
+
+def last(name):
+    # Duration in ms of the most recent span with this name, or None
+    with _lock:
+        entry = _stats.get(name)
+        return entry["last_ms"] if entry else None
+
+
+def last_fields(name):
+    # Fields of the most recent span with this name (e.g. files, matches), or None
+    with _lock:
+        entry = _stats.get(name)
+        return dict(entry["last_fields"]) if entry else None
+
+
+def last_for(name, path):
+    # Duration in ms of the most recent span with this name for one file, or None
+    with _lock:
+        return _last_by_path.get((name, path))
+
+
+def rss_bytes():
+    # Resident memory of this process, or None if it can't be read on this platform
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            process = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+                return None
+            return counters.WorkingSetSize
+        if os.path.exists('/proc/self/statm'):
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        import resource
+        # Peak rather than current on macOS, in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except Exception:
+        return None
+
@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import profiling
+
+# Background save pipeline.
+# Saves run on a small thread pool so slow disks or network shares don't block the UI.
+# Saves of the same file are serialized and coalesced: while one is being written,
+# further requests for that path collapse into a single follow-up save carrying the
+# newest edits. Different files are written concurrently.
+
+
+class SaveQueue:
+    def __init__(self, max_workers=4, fsync=True):
+        self.fsync = fsync
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SaveQueue")
+        self.lock = threading.Lock()
+        self.pending = {} # Maps path to [config_file, edits, callbacks] waiting to be written
+        self.running = set() # Paths currently being written
+        self.idle = threading.Condition(self.lock)
+
+    def submit(self, path, config_file, edits, callback=None):
+        # edits maps line index to new value and is the caller's full set of unsaved
+        # edits. A newer submit for the same path replaces the edits of a job that
+        # hasn't started yet (an edit undone in between must not be written); callbacks
+        # are kept. callback(ok, error) runs on a worker thread.
+        with self.lock:
+            job = self.pending.get(path)
+            if job is None:
+                job = self.pending[path] = [config_file, {}, []]
+            job[0] = config_file
+            job[1] = dict(edits)
+            if callback:
+                job[2].append(callback)
+            if path not in self.running:
+                self.start(path)
+
+    def start(self, path):
+        # Caller holds the lock
+        self.running.add(path)
+        self.pool.submit(self.run, path)
+
+    def run(self, path):
+        with self.lock:
+            config_file, edits, callbacks = self.pending.pop(path)
+
+        error = None
+        try:
+            with profiling.span("save_job", path=path, edits=len(edits)):
+                for line_index, value in edits.items():
+                    config_file.update_line(line_index, value)
+                if config_file.is_dirty():
+                    config_file.save(fsync=self.fsync)
+        except Exception as e:
+            error = e
+
+        for callback in callbacks:
+            try:
+                callback(error is None, error)
+            except Exception as e:
+                print(f"Save callback error: {e}")
+
+        with self.lock:
+            self.running.discard(path)
+            if path in self.pending:
+                # Edits arrived while we were writing: one more save picks them all up
+                self.start(path)
+            elif not self.running:
+                self.idle.notify_all()
+
+    def is_busy(self, path=None):
+        with self.lock:
+            if path is None:
+                return bool(self.running or self.pending)
+            return path in self.running or path in self.pending
+
+    def wait(self, timeout=None):
+        # Block until every queued save has finished
+        with self.lock:
+            return self.idle.wait_for(lambda: not self.running and not self.pending, timeout)
+
+    def shutdown(self):
+        self.wait()
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,240 @@
+import fnmatch
+import json
+import os
+import re
+
+# Typed validation for known server config keys (EOSERV / etheos config.ini and friends).
+# Rules map a key, or a key pattern with * and ?, to a type spec:
+#   "int", "int:0:100"   integer, optional inclusive bounds (either may be left empty)
+#   "float:0:"           number
+#   "bool"               yes/no, true/false, on/off, 1/0
+#   "port"               integer 1-65535
+#   "duration"           number with an optional unit: 500ms, 10s, 5m, 1h, 2d
+#   "path"               non-empty file or directory path
+#   "host"               host name or IP address
+#   "enum:a,b,c"         one of the listed words (case-insensitive)
+# Each spec is compiled into a validator once; validators return None or an error message.
+# Keys without a rule are not checked. Extra rules can be put in schema.json next to
+# settings.json, e.g. {"MyPluginPort": "port"}.
+
+SCHEMA_FILE = 'schema.json'
+
+ENDLESS_RULES = {
+    # Server
+    "Host": "host",
+    "Port": "port",
+    "MaxConnections": "int:1:",
+    "ListenBacklog": "int:1:",
+    "MaxPlayers": "int:1:",
+    "MaxConnectionsPerIP": "int:0:",
+    "MaxConnectionsPerPC": "int:0:",
+    "IPReconnectLimit": "duration",
+    "MaxLoginAttempts": "int:0:",
+    "CheckVersion": "bool",
+    "MinVersion": "int:0:",
+    "MaxVersion": "int:0:",
+    "OldVersionCompat": "bool",
+    "TimedSave": "duration",
+    "IgnoreHDID": "bool",
+    "ServerLanguage": "path",
+    "UseAdjustedStats": "bool",
+    "PingRate": "duration",
+    "EnforceSequence": "bool",
+    "EnforceTimestamps": "bool",
+    "EnforceSessions": "bool",
+    "LimitDamage": "bool",
+    "DeathRecover": "bool",
+    "WarpBubbles": "bool",
+    "HideGlobal": "bool",
+    "GlobalBuffer": "int:0:",
+    "AdminPrefix": "str",
+    "StartMap": "int:0:",
+    "StartX": "int:0:",
+    "StartY": "int:0:",
+    "JailMap": "int:0:",
+    "JailX": "int:0:",
+    "JailY": "int:0:",
+    "Maps": "int:1:",
+
+    # Database
+    "DBType": "enum:sqlite,mysql,sqlserver",
+    "DBHost": "host",
+    "DBPort": "port",
+    "DBName": "str",
+    "AutoCreateDatabase": "bool",
+
+    # Server link (SLN)
+    "SLN": "bool",
+    "SLNURL": "str",
+    "SLNPeriod": "duration",
+    "SLNBind": "str",
+
+    # Data files
+    "EIF": "path",
+    "ENF": "path",
+    "ESF": "path",
+    "ECF": "path",
+    "MapDir": "path",
+    "*File": "path",
+    "LogOut": "path",
+    "LogErr": "path",
+
+    # Logging
+    "StyleConsole": "bool",
+    "LogCommands": "bool",
+    "LogReports": "bool",
+
+    # Rates and limits
+    "*Rate": "float:0:",
+    "*Timer": "duration",
+    "*Timeout": "duration",
+    "Max*": "int:0:",
+    "Min*": "int:0:",
+    "ChatLength": "int:1:",
+    "ShowLevel": "bool",
+    "NPCChaseMode": "int:0:",
+    "NPCBoredTimer": "duration",
+    "NPCAdjustMaxDam": "int:0:",
+}
+
+BOOL_WORDS = {'yes', 'no', 'true', 'false', 'on', 'off', '1', '0'}
+INT_VALUE = re.compile(r'[+-]?\d+$')
+FLOAT_VALUE = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)$')
+DURATION_VALUE = re.compile(r'(\d+(\.\d*)?|\.\d+)\s*(ms|s|m|h|d)?$', re.IGNORECASE)
+HOST_VALUE = re.compile(r'[A-Za-z0-9]([A-Za-z0-9.-]*[A-Za-z0-9])?$|[0-9a-fA-F:]+$')
+PATH_BAD_CHARS = re.compile(r'[<>"|?*\x00-\x1f]')
+
+
+class SchemaError(Exception):
+    pass
+
+
+def parse_bounds(args, convert):
+    low = convert(args[0]) if len(args) > 0 and args[0] != '' else None
+    high = convert(args[1]) if len(args) > 1 and args[1] != '' else None
+    return low, high
+
+
+def number_validator(pattern, convert, kind, args):
+    low, high = parse_bounds(args, convert)
+
+    def validate(value):
+        if not pattern.match(value):
+            return f"expected {kind}"
+        number = convert(value)
+        if low is not None and number < low:
+            return f"must be at least {args[0]}"
+        if high is not None and number > high:
+            return f"must be at most {args[1]}"
+        return None
+    return validate
+
+
+def compile_spec(spec):
+    kind, _, rest = spec.partition(':')
+    args = rest.split(':') if rest else []
+    if kind == 'int':
+        return number_validator(INT_VALUE, int, "a whole number", args)
+    if kind == 'float':
+        return number_validator(FLOAT_VALUE, float, "a number", args)
+    if kind == 'port':
+        return number_validator(INT_VALUE, int, "a port number", ['1', '65535'])
+    if kind == 'bool':
+        return lambda value: None if value.lower() in BOOL_WORDS else "expected yes or no"
+    if kind == 'duration':
+        return lambda value: None if DURATION_VALUE.match(value) else "expected a duration like 10s or 5m"
+    if kind == 'host':
+        return lambda value: None if HOST_VALUE.match(value) else "expected a host name or IP address"
+    if kind == 'path':
+        def validate_path(value):
+            if not value:
+                return "expected a path"
+            if PATH_BAD_CHARS.search(value):
+                return "path contains invalid characters"
+            return None
+        return validate_path
+    if kind == 'enum':
+        choices = [choice.strip() for choice in rest.split(',') if choice.strip()]
+        allowed = {choice.lower() for choice in choices}
+        message = "expected one of " + ", ".join(choices)
+        return lambda value: None if value.lower() in allowed else message
+    if kind == 'str':
+        return None
+    raise SchemaError(f"Unknown type spec: {spec}")
+
+
+class Schema:
+    def __init__(self, rules):
+        self.exact = {}
+        patterns = []
+        validators = []
+        for key, spec in rules.items():
+            validator = compile_spec(spec)
+            if any(ch in key for ch in '*?['):
+                patterns.append(fnmatch.translate(key))
+                validators.append(validator)
+            else:
+                self.exact[key] = validator
+        # All key patterns in one regex; the first matching group picks the validator
+        self.pattern = re.compile('|'.join(f'({p})' for p in patterns)) if patterns else None
+        self.pattern_validators = validators
+        self.cache = {} # Maps key to its validator (or None), so each key is looked up once
+
+    def validator_for(self, key):
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+        if key in self.exact:
+            validator = self.exact[key]
+        else:
+            validator = None
+            match = self.pattern.match(key) if self.pattern else None
+            if match:
+                validator = self.pattern_validators[match.lastindex - 1]
+        self.cache[key] = validator
+        return validator
+
+    def validate(self, key, value):
+        # Error message for a bad value, or None
+        validator = self.validator_for(key)
+        if validator is None:
+            return None
+        return validator(value.strip())
+
+    def validate_file(self, config_file):
+        # Returns [(line index, key, value, message)] for every invalid value
+        problems = []
+        for line in config_file.lines:
+            if line.type != line.TYPE_KEY_VALUE:
+                continue
+            message = self.validate(line.key, line.value)
+            if message:
+                problems.append((line.line_num, line.key, line.value, message))
+        return problems
+
+
+def load_schema(path=SCHEMA_FILE):
+    # Built-in rules, extended or overridden by schema.json when present
+    rules = dict(ENDLESS_RULES)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                rules.update(json.load(f))
+        except Exception as e:
+            print(f"Ignoring {path}: {e}")
+    try:
+        return Schema(rules)
+    except SchemaError as e:
+        print(f"Ignoring {path}: {e}")
+        return Schema(ENDLESS_RULES)
+
+
+_schema = None
+
+
+def get_schema():
+    global _schema
+    if _schema is None:
+        _schema = load_schema()
+    return _schema
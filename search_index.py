@@ -0,0 +1,147 @@
+import os
+
+import profiling
+
+# Substring search index for the sidebar content filter.
+# Each file is indexed once by its lowercase text and the set of trigrams it contains.
+# A query only looks at files containing every trigram of the text it requires
+# (Matcher.literal), then confirms the match against the cached text with the compiled
+# matcher, so nothing is read from disk while typing.
+
+NGRAM = 3
+
+
+def trigrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class SearchIndex:
+    def __init__(self):
+        self.files = {}    # Maps path to (mtime_ns, size, lowercase text)
+        self.postings = {} # Maps trigram to set of paths containing it
+
+    def state(self):
+        return (self.files, self.postings)
+
+    def restore(self, state):
+        # Adopt a saved index; sync() then re-indexes only files that changed since
+        self.files, self.postings = state
+
+    def clear(self):
+        self.files = {}
+        self.postings = {}
+
+    def build(self, file_paths):
+        self.clear()
+        for fpath in file_paths:
+            self.update_file(fpath)
+
+    def read_text(self, fpath):
+        # Reuse an already parsed copy (e.g. an open tab) instead of reading the file again.
+        # Imported here so the parser isn't loaded before the first frame at startup.
+        from config_parser import decode_text
+        from file_cache import file_cache
+        config = file_cache.peek(fpath)
+        if config is not None and not config.is_dirty():
+            return config.text().lower()
+        with open(fpath, 'rb') as f:
+            return decode_text(f.read()).lower()
+
+    def update_file(self, fpath):
+        # (Re)index a single file, e.g. after it was saved or changed on disk
+        try:
+            st = os.stat(fpath)
+            text = self.read_text(fpath)
+        except OSError as e:
+            print(f"Error reading {fpath}: {e}")
+            self.remove_file(fpath)
+            return
+
+        entry = self.files.get(fpath)
+        if entry is not None and entry[2] == text:
+            # Touched but not changed (e.g. copied back from a backup): keep the postings
+            self.files[fpath] = (st.st_mtime_ns, st.st_size, text)
+            return
+
+        self.remove_file(fpath)
+        self.files[fpath] = (st.st_mtime_ns, st.st_size, text)
+        for gram in trigrams(text):
+            self.postings.setdefault(gram, set()).add(fpath)
+
+    def remove_file(self, fpath):
+        entry = self.files.pop(fpath, None)
+        if entry is None:
+            return
+        for gram in trigrams(entry[2]):
+            paths = self.postings.get(gram)
+            if paths is not None:
+                paths.discard(fpath)
+                if not paths:
+                    del self.postings[gram]
+
+    def is_stale(self, fpath):
+        entry = self.files.get(fpath)
+        if entry is None:
+            return True
+        try:
+            st = os.stat(fpath)
+        except OSError:
+            return True
+        return (st.st_mtime_ns, st.st_size) != entry[:2]
+
+    def sync(self, file_paths):
+        # Bring the index in line with a file list: drop missing files and
+        # re-index only files that are new or whose mtime/size changed.
+        with profiling.span("index_sync") as info:
+            wanted = set(file_paths)
+            for fpath in list(self.files):
+                if fpath not in wanted:
+                    self.remove_file(fpath)
+            updated = 0
+            for fpath in file_paths:
+                if self.is_stale(fpath):
+                    self.update_file(fpath)
+                    updated += 1
+            info["files"] = len(file_paths)
+            info["updated"] = updated
+
+    def candidates(self, query):
+        if len(query) < NGRAM:
+            return set(self.files)
+        # Intersect starting from the rarest trigram to keep the sets small
+        posting_sets = []
+        for gram in trigrams(query):
+            paths = self.postings.get(gram)
+            if not paths:
+                return set()
+            posting_sets.append(paths)
+        posting_sets.sort(key=len)
+        result = set(posting_sets[0])
+        for paths in posting_sets[1:]:
+            result &= paths
+            if not result:
+                break
+        return result
+
+    def search(self, matcher, file_paths=None, check_cancelled=None):
+        # Returns paths matched by a search_matcher.Matcher, keeping the order of file_paths
+        # when given. check_cancelled is called periodically and may raise to abort a stale search.
+        with profiling.span("search", query=matcher.query, mode=matcher.mode) as info:
+            if not matcher:
+                candidates = set()
+            elif matcher.literal:
+                candidates = self.candidates(matcher.literal)
+            else:
+                candidates = set(self.files)
+            matches = set()
+            match_text = matcher.match_text
+            for i, fpath in enumerate(candidates):
+                if check_cancelled and i % 64 == 0:
+                    check_cancelled()
+                if match_text(self.files[fpath][2]):
+                    matches.add(fpath)
+            info["candidates"] = len(candidates)
+            info["matches"] = len(matches)
+        if file_paths is None:
+            return sorted(matches)
+        return [fpath for fpath in file_paths if fpath in matches]
@@ -0,0 +1,213 @@
+import bisect
+import re
+
+# Compiled search queries shared by the sidebar file filter (SearchIndex) and the
+# in-editor highlighting (EditorView). A Matcher is built once per query; all matching
+# is case-insensitive and runs compiled regexes over whole texts rather than testing
+# line by line in Python. Queries are lowercased, except regexes: lowercasing would
+# turn \S, \D, \W, \B into their opposites, and re.IGNORECASE covers case anyway.
+#
+# Modes:
+#   text   - plain substring (the default)
+#   regex  - regular expression
+#   word   - whole word
+#   key    - key names only, with optional wildcards and a value condition:
+#            "*Rate > 1", "Port", "Max*=500", "*Path != ./data"
+#   value  - substring in values only
+#   fuzzy  - key names containing the query letters in order ("mxcon" -> MaxConnections)
+
+MODE_TEXT = 'text'
+MODE_REGEX = 'regex'
+MODE_WORD = 'word'
+MODE_KEY = 'key'
+MODE_VALUE = 'value'
+MODE_FUZZY = 'fuzzy'
+
+MODES = [MODE_TEXT, MODE_REGEX, MODE_WORD, MODE_KEY, MODE_VALUE, MODE_FUZZY]
+
+# Mirrors ConfigLine's key/value detection: not a comment, a non-empty key before the first '='.
+# Key/value/fuzzy modes splice their key or value pattern into this to get one regex that
+# finds matching lines in a whole file: group 1 is the key, group 2 the value.
+LINE_START = r'^[ \t]*(?=[^#\s=])'
+KEY_CHARS = r'[^=\n]'
+
+KEY_QUERY = re.compile(r'^\s*(?P<key>[^<>=!]+?)\s*(?:(?P<op><=|>=|!=|==|=|<|>)\s*(?P<value>.*?))?\s*$')
+
+COMPARE = {
+    '=': lambda a, b: a == b,
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def to_number(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def glob_to_regex(pattern):
+    # Key wildcards: * and ?. Without wildcards the key just has to contain the text.
+    # Returns regex source that never crosses '=' or a line break.
+    if '*' not in pattern and '?' not in pattern:
+        pattern = '*' + pattern + '*'
+    parts = []
+    for ch in pattern:
+        if ch == '*':
+            parts.append(KEY_CHARS + '*')
+        elif ch == '?':
+            parts.append(KEY_CHARS)
+        else:
+            parts.append(re.escape(ch))
+    return ''.join(parts)
+
+
+def normalize_query(query, mode):
+    return query if mode == MODE_REGEX else query.lower()
+
+
+class Matcher:
+    def __init__(self, query, mode=MODE_TEXT):
+        self.query = normalize_query(query, mode)
+        self.mode = mode
+        self.error = None
+        self.pattern = None       # Searched in free text (text/regex/word/value)
+        self.key_pattern = None   # Matched against lines of key names (key/fuzzy)
+        self.line_pattern = None  # Finds matching key/value lines in file text (key/value/fuzzy)
+        self.value_op = None
+        self.value_operand = None
+        self.literal = None       # Text every matching file must contain, for index pruning
+        self.compile()
+
+    def compile(self):
+        query = self.query
+        if not query:
+            return
+        try:
+            if self.mode == MODE_REGEX:
+                self.pattern = re.compile(query, re.IGNORECASE | re.MULTILINE)
+            elif self.mode == MODE_WORD:
+                self.pattern = re.compile(r'\b' + re.escape(query) + r'\b', re.IGNORECASE)
+                self.literal = query
+            elif self.mode == MODE_KEY:
+                self.compile_key_query(query)
+            elif self.mode == MODE_FUZZY:
+                gap = KEY_CHARS + '*?'
+                body = gap.join(re.escape(ch) for ch in query if not ch.isspace())
+                self.compile_key_pattern(gap + body + KEY_CHARS + '*')
+            else:
+                # text and value modes
+                self.pattern = re.compile(re.escape(query), re.IGNORECASE)
+                self.literal = query
+                if self.mode == MODE_VALUE:
+                    self.line_pattern = re.compile(
+                        LINE_START + r'(' + KEY_CHARS + r'*?)[ \t]*=([^\n]*?' + re.escape(query) + r'[^\n]*)$',
+                        re.IGNORECASE | re.MULTILINE)
+        except re.error as e:
+            self.error = str(e)
+            self.pattern = None
+            self.key_pattern = None
+
+    def compile_key_query(self, query):
+        match = KEY_QUERY.match(query)
+        if not match:
+            self.error = "Expected: key [op value]"
+            return
+        key = match.group('key').strip()
+        self.compile_key_pattern(glob_to_regex(key))
+        if match.group('op'):
+            self.value_op = COMPARE[match.group('op')]
+            self.value_operand = match.group('value').strip()
+        # Longest literal piece of the key glob, e.g. "rate" for "*rate"
+        longest = max(re.split(r'[*?]', key), key=len)
+        if len(longest) >= 3:
+            self.literal = longest
+
+    def compile_key_pattern(self, source):
+        flags = re.IGNORECASE | re.MULTILINE
+        self.key_pattern = re.compile('^' + source + '$', flags)
+        self.line_pattern = re.compile(LINE_START + '(' + source + r')[ \t]*=([^\n]*)$', flags)
+
+    def __bool__(self):
+        return bool(self.query) and self.error is None
+
+    def cache_key(self):
+        return (self.mode, self.query)
+
+    @staticmethod
+    def key_for(query, mode):
+        # cache_key() of the Matcher this query and mode would build
+        return (mode, normalize_query(query, mode))
+
+    def searches_keys(self):
+        return self.mode in (MODE_KEY, MODE_FUZZY)
+
+    def value_ok(self, value):
+        if self.value_op is None:
+            return True
+        value = value.strip().lower()
+        left, right = to_number(value), to_number(self.value_operand)
+        if left is not None and right is not None:
+            return self.value_op(left, right)
+        if self.value_op in (COMPARE['='], COMPARE['=='], COMPARE['!=']):
+            return self.value_op(value, self.value_operand)
+        return False # Ordering comparisons need numbers
+
+    # Whole-file matching (sidebar filter), on lowercase file text
+
+    def match_text(self, text):
+        if not self:
+            return False
+        if self.line_pattern is None:
+            return self.pattern.search(text) is not None
+        if self.value_op is None:
+            return self.line_pattern.search(text) is not None
+        # Only lines whose key already matched get their value checked in Python
+        return any(self.value_ok(m.group(2)) for m in self.line_pattern.finditer(text))
+
+    # Per-row matching (editor), over lists of lowercase row texts
+
+    def matching_indices(self, texts, candidates=None, pattern=None):
+        # Indices of texts matched by the free-text pattern (or the given one). The texts
+        # are joined and searched in one pass; match offsets are mapped back to rows by
+        # bisection. texts may be a list or a dict; candidates limits the indices searched.
+        # A hit that runs past the end of its row (a regex like \s* can cross the line
+        # break) only counts if the row matches on its own.
+        pattern = pattern or self.pattern
+        if pattern is None:
+            return set()
+        if candidates is not None:
+            candidates = list(candidates)
+            found = self.matching_indices([texts[i] for i in candidates], pattern=pattern)
+            return {candidates[i] for i in found}
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 1
+        joined = '\n'.join(texts)
+        result = set()
+        search = pattern.search
+        m = search(joined)
+        while m:
+            index = bisect.bisect_right(starts, m.start()) - 1
+            if m.end() <= starts[index] + len(texts[index]) or search(texts[index]):
+                result.add(index)
+            # Continue from the next row; one hit per row is enough
+            if index + 1 >= len(starts):
+                break
+            m = search(joined, starts[index + 1])
+        return result
+
+    def matching_keys(self, keys, values):
+        # Indices of key/value rows whose key (and value condition) match.
+        # keys and values map row index to lowercase key and value.
+        found = self.matching_indices(keys, keys.keys(), self.key_pattern)
+        if self.value_op is None:
+            return found
+        return {i for i in found if self.value_ok(values[i])}
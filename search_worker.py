@@ -0,0 +1,101 @@
+import threading
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class SearchWorker:
+    # Runs index maintenance and content searches on a single background thread.
+    # Only the newest search is kept: submitting a query cancels the one in flight
+    # and replaces any that is still waiting. Callbacks are handed to `post`, which
+    # is responsible for running them on the UI thread.
+
+    def __init__(self, index, post):
+        self.index = index
+        self.post = post
+        self.generation = 0
+        self.pending_search = None
+        self.pending_tasks = []
+        self.running = True
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="SearchWorker", daemon=True)
+        self.thread.start()
+
+    def submit(self, matcher, file_paths, callback):
+        # matcher is a compiled search_matcher.Matcher; callback(matcher, results)
+        with self.cond:
+            self.generation += 1
+            self.pending_search = (self.generation, matcher, list(file_paths), callback)
+            self.cond.notify()
+
+    def cancel(self):
+        with self.cond:
+            self.generation += 1
+            self.pending_search = None
+
+    def sync(self, file_paths, callback=None):
+        self.add_task(self.index.sync, list(file_paths), callback)
+
+    def update_file(self, file_path, callback=None):
+        self.add_task(self.index.update_file, file_path, callback)
+
+    def add_task(self, func, arg, callback):
+        with self.cond:
+            self.pending_tasks.append((func, arg, callback))
+            self.cond.notify()
+
+    def stop(self, timeout=None):
+        # With a timeout, wait that long for a task in progress to finish
+        with self.cond:
+            self.running = False
+            self.generation += 1
+            self.cond.notify()
+        if timeout is not None:
+            self.thread.join(timeout)
+
+    def is_current(self, generation):
+        return generation == self.generation
+
+    def run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.pending_tasks and not self.pending_search:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                # Index updates go first so searches see fresh content
+                if self.pending_tasks:
+                    job = ('task', self.pending_tasks.pop(0))
+                else:
+                    job = ('search', self.pending_search)
+                    self.pending_search = None
+
+            kind, payload = job
+            if kind == 'task':
+                func, arg, callback = payload
+                try:
+                    func(arg)
+                except Exception as e:
+                    print(f"Search index error: {e}")
+                if callback:
+                    self.post(callback)
+                continue
+
+            generation, matcher, file_paths, callback = payload
+
+            def check_cancelled():
+                if not self.is_current(generation):
+                    raise SearchCancelled()
+
+            try:
+                results = self.index.search(matcher, file_paths, check_cancelled=check_cancelled)
+            except SearchCancelled:
+                continue
+            except Exception as e:
+                print(f"Search error: {e}")
+                continue
+
+            # Drop results that were superseded while we were searching
+            if self.is_current(generation):
+                self.post(callback, matcher, results)
@@ -6,7 +6,13 @@ SETTINGS_FILE = 'settings.json'
 class Settings:
     def __init__(self):
         self.data = {
-            "last_folder": None
+            "last_folder": None, # The active root: Compare and Find & Replace work on it
+            "roots": [], # Every folder in the workspace (one per server instance)
+            "max_live_tabs": 5,
+            "tab_idle_seconds": 600,
+            "fsync_on_save": True,
+            "restore_workspace": True,
+            "show_perf_bar": False
         }
         self.load()
 
@@ -14,9 +20,12 @@ class Settings:
         if os.path.exists(SETTINGS_FILE):
             try:
                 with open(SETTINGS_FILE, 'r') as f:
-                    self.data = json.load(f)
+                    self.data.update(json.load(f))
             except:
                 pass # Ignore errors, stick to defaults
+        # Settings from before multi-root workspaces only have last_folder
+        if not self.data.get("roots") and self.data.get("last_folder"):
+            self.data["roots"] = [self.data["last_folder"]]
 
     def save(self):
         with open(SETTINGS_FILE, 'w') as f:
@@ -28,3 +37,34 @@ class Settings:
     def set_last_folder(self, path):
         self.data["last_folder"] = path
         self.save()
+
+    def get_roots(self):
+        return list(self.data.get("roots") or [])
+
+    def set_roots(self, roots):
+        self.data["roots"] = list(roots)
+        self.save()
+
+    def get_max_live_tabs(self):
+        # Tabs beyond this many keep their model but have their widgets destroyed
+        return self.data.get("max_live_tabs", 5)
+
+    def get_tab_idle_seconds(self):
+        # Inactive tabs are hibernated after this long
+        return self.data.get("tab_idle_seconds", 600)
+
+    def get_fsync_on_save(self):
+        # Flush saves to disk before the atomic rename (slower on network shares)
+        return self.data.get("fsync_on_save", True)
+
+    def get_restore_workspace(self):
+        # Save the file list, search index and open tabs on exit and restore them on start
+        return self.data.get("restore_workspace", True)
+
+    def get_show_perf_bar(self):
+        # Diagnostics bar at the bottom of the window (F12)
+        return self.data.get("show_perf_bar", False)
+
+    def set_show_perf_bar(self, show):
+        self.data["show_perf_bar"] = show
+        self.save()
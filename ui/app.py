@@ -1,14 +1,30 @@
 import customtkinter as ctk
 import os
 import sys
-import glob
+import queue
+import threading
+import time
 
 # Allow importing from parent directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import profiling
 import theme
 from settings import Settings
-from ui.editor_view import EditorView
+from file_scanner import FolderScanner, scan_roots
+from search_index import SearchIndex
+from search_matcher import Matcher, MODES, MODE_TEXT
+from search_worker import SearchWorker
+from save_queue import SaveQueue
+import workspace_snapshot
+from ui.virtual_list import VirtualList
+# ui.editor_view, ui.compare_view, ui.perf_bar and folder_diff are imported on first use to keep startup fast
+
+SEARCH_DEBOUNCE_MS = 150
+UI_QUEUE_POLL_MS = 30
+HIBERNATE_CHECK_MS = 30 * 1000
+FILE_ROW_HEIGHT = 32
+REPLACE_TAB = "Find & Replace"
 
 class App(ctk.CTk):
     def __init__(self):
@@ -24,16 +40,74 @@ class App(ctk.CTk):
         self.configure(fg_color=theme.BG_COLOR)
 
         self.settings = Settings()
-        self.current_folder = self.settings.get_last_folder()
-        self.ini_files = [] # List of full paths
+        # A workspace is one or more roots (e.g. one per server instance), scanned together
+        self.roots = self.settings.get_roots()
+        self.current_folder = self.settings.get_last_folder() # Active root, used by Compare and Find & Replace
+        if self.current_folder not in self.roots:
+            self.current_folder = self.roots[0] if self.roots else None
+        self.ini_files = [] # Full paths of every root's files, grouped by root in workspace order
+        self.scanners = {} # Maps root to its FolderScanner
+        self.root_files = {} # Maps root to its files
+        self.file_roots = {} # Maps file path to the root it was found under
+        self.scan_running = False
+        self.rescan_pending = False # Refresh requested while a scan was running
+        self.interactive = False # Set once the first folder scan has been shown
+        self.editors = {} # Maps tab name to its EditorView
+        self.tab_last_used = {} # Maps tab name to time.monotonic() of its last selection
+        self.compare_views = {} # Maps tab name to its CompareView
+        self.replace_view = None
+        self.perf_bar = None
+        self.edit_logs = {} # Maps file path to its EditLog, so unsaved edits and history outlive the tab
+        self.search_index = SearchIndex()
+
+        # Background work posts callbacks here; they are run on the Tk thread by drain_ui_queue
+        self.ui_queue = queue.Queue()
+        self.search_worker = SearchWorker(self.search_index, self.post_to_ui)
+        self.save_queue = SaveQueue(fsync=self.settings.get_fsync_on_save())
+        self.search_after_id = None
+        self.search_matcher = None # Compiled query, reused until the text or mode changes
+        self.after(UI_QUEUE_POLL_MS, self.drain_ui_queue)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(HIBERNATE_CHECK_MS, self.check_idle_tabs)
 
         self.setup_ui()
 
-        # If we have a stored folder, try to load it. Otherwise show selector.
-        if self.current_folder and os.path.exists(self.current_folder):
-            self.load_folder(self.current_folder)
+        # Files may be edited outside the app; re-check the index when the window regains focus
+        self.bind("<FocusIn>", self.on_focus_in)
+
+        # Undo / redo in the current editor
+        self.bind("<Control-z>", self.undo_edit)
+        self.bind("<Control-y>", self.redo_edit)
+        self.bind("<Control-Z>", self.redo_edit) # Ctrl+Shift+Z
+
+        # Performance overlay: widget counts, parse/search timings, memory and event-loop lag
+        self.bind("<F12>", lambda e: self.toggle_perf_bar())
+        if self.settings.get_show_perf_bar():
+            self.after_idle(self.show_perf_bar)
+
+        # Show the window first; the stored folder is scanned once the first frame is drawn
+        profiling.startup_mark("app_init")
+        self.after_idle(lambda: self.after(0, self.on_first_frame))
+
+    def on_first_frame(self):
+        profiling.startup_mark("first_frame")
+        # If we have stored folders, load them. Otherwise show selector.
+        if any(os.path.exists(root) for root in self.roots):
+            if self.settings.get_restore_workspace():
+                self.load_snapshot()
+            else:
+                self.load_workspace()
         else:
             self.show_folder_selection()
+            self.mark_interactive()
+
+    def mark_interactive(self):
+        if self.interactive:
+            return
+        self.interactive = True
+        profiling.startup_mark("interactive", files=len(self.ini_files))
+        if profiling.startup_mode == 'exit':
+            self.after_idle(self.on_close)
 
     def setup_ui(self):
         # Grid Layout
@@ -56,31 +130,127 @@ class App(ctk.CTk):
 
 
 
-        # Change Folder Button
+        # Folder Buttons
+        self.folder_buttons = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        self.folder_buttons.grid(row=1, column=0, padx=20, pady=5)
+
+        # Add a folder (server instance) to the workspace
         self.folder_btn = ctk.CTkButton(
-            self.sidebar,
-            text="Change Folder",
+            self.folder_buttons,
+            text="Add Folder",
             command=self.select_folder_dialog,
             fg_color=theme.FG_COLOR,
             hover_color=theme.ACCENT_COLOR,
             border_width=2,
             border_color=theme.ACCENT_COLOR
         )
-        self.folder_btn.grid(row=1, column=0, padx=20, pady=5)
+        self.folder_btn.grid(row=0, column=0)
 
-        # Search Entry
-        self.search_entry = ctk.CTkEntry(self.sidebar, placeholder_text="Search content...")
-        self.search_entry.grid(row=2, column=0, padx=20, pady=5)
-        self.search_entry.bind("<KeyRelease>", self.search_files)
+        # Refresh Button (re-walks only directories that changed)
+        self.refresh_btn = ctk.CTkButton(
+            self.folder_buttons,
+            text="Refresh",
+            command=self.refresh_files,
+            width=70,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.ACCENT_COLOR,
+            border_width=2,
+            border_color=theme.ACCENT_COLOR
+        )
+        self.refresh_btn.grid(row=0, column=1, padx=(5, 0))
 
-        # File List Scrollable
-        self.file_list_frame = ctk.CTkScrollableFrame(
-            self.sidebar, 
-            fg_color="transparent",
-            label_text="Files Found",
-            label_text_color=theme.TEXT_SECONDARY_COLOR
+        # Drop the active root (click a folder heading in the list to make it active)
+        self.remove_btn = ctk.CTkButton(
+            self.folder_buttons,
+            text="Remove Folder",
+            command=self.remove_active_root,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.ACCENT_COLOR,
+            border_width=2,
+            border_color=theme.ACCENT_COLOR
+        )
+        self.remove_btn.grid(row=1, column=0, columnspan=2, pady=(5, 0), sticky="ew")
+
+        # Compare the current folder against another install tree
+        self.compare_btn = ctk.CTkButton(
+            self.folder_buttons,
+            text="Compare With Folder...",
+            command=self.compare_folder_dialog,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.ACCENT_COLOR,
+            border_width=2,
+            border_color=theme.ACCENT_COLOR
         )
+        self.compare_btn.grid(row=2, column=0, columnspan=2, pady=(5, 0), sticky="ew")
+
+        # Find and replace across every file in the folder
+        self.replace_btn = ctk.CTkButton(
+            self.folder_buttons,
+            text="Find && Replace...",
+            command=self.open_replace_view,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.ACCENT_COLOR,
+            border_width=2,
+            border_color=theme.ACCENT_COLOR
+        )
+        self.replace_btn.grid(row=3, column=0, columnspan=2, pady=(5, 0), sticky="ew")
+
+        # Save every open tab; saves of different files run concurrently
+        self.save_all_btn = ctk.CTkButton(
+            self.folder_buttons,
+            text="Save All",
+            command=self.save_all,
+            fg_color=theme.ACCENT_COLOR,
+            hover_color=theme.HOVER_COLOR,
+            text_color=theme.TEXT_COLOR
+        )
+        self.save_all_btn.grid(row=4, column=0, columnspan=2, pady=(5, 0), sticky="ew")
+
+        # Search Entry and mode (text, regex, word, key, value, fuzzy)
+        self.search_frame = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        self.search_frame.grid(row=2, column=0, padx=20, pady=5)
+
+        self.search_entry = ctk.CTkEntry(self.search_frame, placeholder_text="Search content...")
+        self.search_entry.grid(row=0, column=0)
+        self.search_border_color = self.search_entry.cget("border_color")
+        self.search_mode = ctk.CTkOptionMenu(
+            self.search_frame,
+            values=MODES,
+            command=lambda mode: self.search_files(),
+            width=80,
+            fg_color=theme.ACCENT_COLOR,
+            button_color=theme.ACCENT_COLOR,
+            button_hover_color=theme.HOVER_COLOR
+        )
+        self.search_mode.set(MODE_TEXT)
+        self.search_mode.grid(row=0, column=1, padx=(5, 0))
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+        # Enter / Shift+Enter step through matches in the open file
+        self.search_entry.bind("<Return>", lambda e: self.step_match(1))
+        self.search_entry.bind("<Shift-Return>", lambda e: self.step_match(-1))
+
+        # File List (virtualized: only visible entries have buttons, and they are reused)
+        self.file_list_frame = ctk.CTkFrame(self.sidebar, fg_color="transparent")
         self.file_list_frame.grid(row=3, column=0, padx=10, pady=10, sticky="nsew")
+        self.file_list_frame.grid_columnconfigure(0, weight=1)
+        self.file_list_frame.grid_rowconfigure(1, weight=1)
+
+        self.file_list_label = ctk.CTkLabel(
+            self.file_list_frame,
+            text="Files Found",
+            text_color=theme.TEXT_SECONDARY_COLOR
+        )
+        self.file_list_label.grid(row=0, column=0, sticky="ew")
+
+        self.shown_files = [] # Rows currently in the file list: (root, None) headings and (root, path) files
+        self.shown_counts = {} # Maps root to the number of its files in the list
+        self.file_list = VirtualList(
+            self.file_list_frame,
+            row_height=FILE_ROW_HEIGHT,
+            create_row=self.create_file_row,
+            bind_row=self.bind_file_row
+        )
+        self.file_list.grid(row=1, column=0, sticky="nsew")
 
         # Main Content Area
         self.tab_view = ctk.CTkTabview(
@@ -90,7 +260,8 @@ class App(ctk.CTk):
             segmented_button_selected_color=theme.ACCENT_COLOR,
             segmented_button_selected_hover_color=theme.HOVER_COLOR,
             segmented_button_unselected_color=theme.FG_COLOR,
-            segmented_button_unselected_hover_color=theme.HEADER_COLOR
+            segmented_button_unselected_hover_color=theme.HEADER_COLOR,
+            command=self.on_tab_changed
         )
         self.tab_view.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
         
@@ -106,108 +277,362 @@ class App(ctk.CTk):
         # If no folder loaded, hide tab view and show welcome/prompt
         self.tab_view.grid_forget()
         self.welcome_label.grid(row=0, column=1)
-        # Verify valid folder if previously set but now missing
-        if self.current_folder and not os.path.exists(self.current_folder):
-             self.current_folder = None
-             self.settings.set_last_folder(None)
-        
-        if not self.current_folder:
-            # Maybe auto-trigger dialog? Or just let user click button.
-            # User requirement: "initially ask you to select a folder".
-            # Let's verify if we are in the mainloop first.
-            # self.after(100, self.select_folder_dialog) # This can be annoying if popping up immediately
-            pass
+        # Forget folders that were set previously but are now missing
+        existing = [root for root in self.roots if os.path.exists(root)]
+        if existing != self.roots:
+            self.roots = existing
+            self.settings.set_roots(existing)
+        if self.current_folder not in self.roots:
+            self.set_active_root(self.roots[0] if self.roots else None)
 
     def select_folder_dialog(self):
-        folder = ctk.filedialog.askdirectory(title="Select Root Folder")
+        folder = ctk.filedialog.askdirectory(title="Add Folder To Workspace")
         if folder:
-            self.load_folder(folder)
+            self.add_root(folder)
 
-    def load_folder(self, folder_path):
-        self.current_folder = folder_path
-        self.settings.set_last_folder(folder_path)
-        
+    def show_workspace(self):
         # Hide welcome, show tabs
         self.welcome_label.grid_forget()
         self.tab_view.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
 
-        # Scan for INI files
+    def load_workspace(self, snapshot=None):
+        self.show_workspace()
+
+        if snapshot is not None:
+            # Show the saved file lists, index and tabs right away; the scan below checks them
+            for root, (dirs, files) in snapshot["roots"].items():
+                if root not in self.roots:
+                    continue # Removed while the snapshot was loading
+                scanner = FolderScanner(root)
+                scanner.restore(dirs, files)
+                self.scanners[root] = scanner
+                self.root_files[root] = list(files)
+            self.merge_files()
+            if snapshot["index"] is not None:
+                self.search_worker.add_task(self.search_index.restore, snapshot["index"], None)
+            self.update_file_list()
+            self.restore_tabs(snapshot["tabs"], snapshot["current_tab"])
+            self.mark_interactive()
+        else:
+            self.file_list_label.configure(text="Scanning...")
+
+        # Scan every root for INI files (in the background; the list fills in when it is done)
         self.scan_files()
-        
-        # Update sidebar
-        self.update_file_list()
+
+    def load_snapshot(self):
+        # Unpickling a big index takes a moment too, so it happens off the UI thread
+        roots = list(self.roots)
+
+        def run():
+            snapshot = workspace_snapshot.load_snapshot(roots)
+            self.post_to_ui(self.load_workspace, snapshot)
+
+        self.file_list_label.configure(text="Loading...")
+        threading.Thread(target=run, name="SnapshotLoad", daemon=True).start()
+
+    def add_root(self, folder):
+        # The same folder picked twice (or spelled differently) is only scanned once
+        key = os.path.normcase(os.path.normpath(folder))
+        for root in self.roots:
+            if os.path.normcase(os.path.normpath(root)) == key:
+                self.set_active_root(root)
+                return
+        self.roots.append(folder)
+        self.settings.set_roots(self.roots)
+        self.set_active_root(folder)
+        self.show_workspace()
+        self.file_list_label.configure(text="Scanning...")
+        # The other roots are rescanned too, but only their changed directories are re-listed
+        self.scan_files()
+
+    def remove_active_root(self):
+        root = self.current_folder
+        if root is None:
+            return
+        # Open tabs from this root stay open, so their unsaved edits aren't lost
+        self.roots.remove(root)
+        self.settings.set_roots(self.roots)
+        self.scanners.pop(root, None)
+        self.root_files.pop(root, None)
+        if self.replace_view is not None and self.replace_view.root == root:
+            self.close_tab(REPLACE_TAB)
+        self.set_active_root(self.roots[0] if self.roots else None)
+        self.merge_files()
+        self.search_worker.sync(self.ini_files)
+        if not self.roots:
+            self.update_file_list()
+            self.show_folder_selection()
+        elif self.search_entry.get():
+            self.search_files()
+        else:
+            self.update_file_list()
+
+    def set_active_root(self, root):
+        self.current_folder = root
+        self.settings.set_last_folder(root)
+        # Folder headings show which root is active
+        self.file_list.refresh()
+
+    def merge_files(self):
+        # One file list for the whole workspace, so the index and search cover every root at once
+        files = []
+        file_roots = {}
+        for root in self.roots:
+            for path in self.root_files.get(root, ()):
+                if path not in file_roots: # Nested roots: the file belongs to the first one
+                    file_roots[path] = root
+                    files.append(path)
+        self.ini_files = files
+        self.file_roots = file_roots
+
+    def restore_tabs(self, tabs, current_tab):
+        for file_path, top in tabs:
+            if not os.path.exists(file_path):
+                continue
+            try:
+                self.open_file(file_path)
+            except Exception as e:
+                print(f"Could not reopen {file_path}: {e}")
+                continue
+            editor = self.editors.get(self.tab_name_for(file_path))
+            if editor is not None:
+                editor.restore_position(top)
+        if current_tab and os.path.exists(current_tab):
+            self.open_file(current_tab)
+
+    def save_snapshot(self):
+        scanners = [self.scanners[root] for root in self.roots if root in self.scanners]
+        if not scanners or not self.settings.get_restore_workspace():
+            return
+        # The index is only consistent once the worker has stopped
+        index_state = None if self.search_worker.thread.is_alive() else self.search_index.state()
+        tabs = [(editor.file_path, editor.scroll_top()) for editor in self.editors.values()]
+        current = self.current_editor()
+        try:
+            workspace_snapshot.save_snapshot(scanners, index_state, tabs, current.file_path if current else None)
+        except Exception as e:
+            print(f"Error saving workspace snapshot: {e}")
 
     def scan_files(self):
-        self.ini_files = []
-        # Recursive scan for .ini files
-        # Using glob for simplicity
-        search_pattern = os.path.join(self.current_folder, "**", "*.ini")
-        # glob.glob might be slow for huge directories, but for a repo it's fine. 
-        # recursive=True requires python 3.5+
-        files = glob.glob(search_pattern, recursive=True)
-        self.ini_files = sorted(files)
+        # Scan every root for .ini files on a background thread, the roots concurrently.
+        # Scanners remember directory mtimes so refresh_files only re-lists directories that changed.
+        if self.scan_running:
+            self.rescan_pending = True
+            return
+        roots = list(self.roots)
+        scanners = [self.scanners.get(root) or FolderScanner(root) for root in roots]
+        self.scan_running = True
+
+        def run():
+            results = scan_roots(scanners)
+            self.post_to_ui(self.on_scan_done, roots, scanners, results)
+
+        threading.Thread(target=run, name="FolderScan", daemon=True).start()
+
+    def on_scan_done(self, roots, scanners, results):
+        self.scan_running = False
+        if roots != self.roots or self.rescan_pending:
+            # Roots were added or removed, or a refresh came in while scanning: scan again
+            self.rescan_pending = False
+            self.scan_files()
+            return
+        self.scanners = dict(zip(roots, scanners))
+        self.root_files = dict(zip(roots, results))
+        self.merge_files()
+
+        # Index file contents once (in the background) so searching doesn't re-read the trees
+        self.search_worker.sync(self.ini_files)
+
+        # Update sidebar, re-applying the current filter to the new file list
+        if self.search_entry.get():
+            self.search_files()
+        else:
+            self.update_file_list()
+        self.mark_interactive()
+
+    def refresh_files(self):
+        if not self.roots:
+            return
+        self.scan_files()
+
+    def post_to_ui(self, func, *args):
+        # Thread-safe: may be called from worker threads
+        self.ui_queue.put((func, args))
+
+    def drain_ui_queue(self):
+        while True:
+            try:
+                func, args = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"UI callback error: {e}")
+        self.after(UI_QUEUE_POLL_MS, self.drain_ui_queue)
+
+    def on_close(self):
+        self.search_worker.stop(timeout=2)
+        # Let queued saves finish so nothing is lost on exit
+        self.save_queue.shutdown()
+        self.save_snapshot()
+        self.destroy()
+
+    def save_all(self):
+        for editor in self.editors.values():
+            editor.save_changes()
+
+    def schedule_search(self, event=None):
+        # Coalesce bursts of keystrokes into a single search
+        if self.search_after_id is not None:
+            self.after_cancel(self.search_after_id)
+        self.search_after_id = self.after(SEARCH_DEBOUNCE_MS, self.search_files)
+
+    def current_matcher(self):
+        # The same compiled matcher drives the file filter and the editor highlighting
+        query = self.search_entry.get()
+        mode = self.search_mode.get()
+        if self.search_matcher is None or self.search_matcher.cache_key() != Matcher.key_for(query, mode):
+            self.search_matcher = Matcher(query, mode)
+        return self.search_matcher
 
     def search_files(self, event=None):
-        query = self.search_entry.get().lower()
+        self.search_after_id = None
+        matcher = self.current_matcher()
+        self.search_entry.configure(border_color="#f04747" if matcher.error else self.search_border_color)
         
         # 1. Update active editor highlights
-        try:
-            current_tab = self.tab_view.get()
-            # The tab contents are inside the frame returned by self.tab_view.tab(name)
-            tab_frame = self.tab_view.tab(current_tab)
-            # Find the EditorView child
-            for child in tab_frame.winfo_children():
-                if isinstance(child, EditorView):
-                    child.highlight_search(query)
-        except:
-            # No tab selected or other error
-            pass
+        editor = self.current_editor()
+        if editor:
+            editor.highlight_search(matcher)
 
-        # 2. Filter file list
-        if not query:
+        # 2. Filter file list (off the UI thread; newer queries cancel older ones)
+        if not matcher:
+            self.search_worker.cancel()
             self.update_file_list(self.ini_files)
             return
-            
-        filtered_files = []
-        for fpath in self.ini_files:
-            try:
-                with open(fpath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read().lower()
-                    if query in content:
-                        filtered_files.append(fpath)
-            except Exception as e:
-                print(f"Error reading {fpath}: {e}")
-                
+
+        self.search_worker.submit(matcher, self.ini_files, self.on_search_results)
+
+    def step_match(self, direction):
+        editor = self.current_editor()
+        if editor is None:
+            return
+        if editor.search_key != self.current_matcher().cache_key():
+            # Still debouncing: highlight now so navigation uses the current query
+            self.search_files()
+        if direction > 0:
+            editor.next_match()
+        else:
+            editor.prev_match()
+
+    def on_search_results(self, matcher, filtered_files):
+        # Ignore results for a query the user has already typed past
+        if matcher is not self.search_matcher:
+            return
         self.update_file_list(filtered_files)
 
+    def on_focus_in(self, event=None):
+        # Only react to the window itself gaining focus, not to focus moving between children
+        if event is not None and event.widget is not self:
+            return
+        if self.roots:
+            self.search_worker.sync(self.ini_files)
+
+    def on_file_saved(self, file_path):
+        self.search_worker.update_file(file_path)
+
     def update_file_list(self, file_list=None):
-        # Clear existing buttons
-        for widget in self.file_list_frame.winfo_children():
-            widget.destroy()
+        files_to_show = list(file_list) if file_list is not None else list(self.ini_files)
+        label = f"Files Found ({len(files_to_show)})"
+        if len(self.roots) > 1:
+            label += f" in {len(self.roots)} folders"
+        self.file_list_label.configure(text=label)
 
-        files_to_show = file_list if file_list is not None else self.ini_files
+        # Group by root under a heading each; while filtering, roots without matches are left out
+        by_root = {}
+        for path in files_to_show:
+            by_root.setdefault(self.file_roots.get(path), []).append(path)
+        rows = []
+        for root in self.roots:
+            paths = by_root.get(root, [])
+            if paths or file_list is None:
+                rows.append((root, None))
+                rows.extend((root, path) for path in paths)
+        self.shown_counts = {root: len(paths) for root, paths in by_root.items()}
+        if rows == self.shown_files:
+            return
+        self.shown_files = rows
+        # Rows showing the same entry as before are left untouched by bind_file_row
+        self.file_list.set_count(len(rows))
 
-        for fpath in files_to_show:
-            # Create relative path for display
-            try:
-                rel_path = os.path.relpath(fpath, self.current_folder)
-            except:
-                rel_path = os.path.basename(fpath)
-
-            btn = ctk.CTkButton(
-                self.file_list_frame,
-                text=rel_path,
-                anchor="w",
-                fg_color="transparent",
-                text_color=theme.TEXT_COLOR,
-                hover_color=theme.FG_COLOR,
-                command=lambda p=fpath: self.open_file(p)
+    def create_file_row(self, master):
+        btn = ctk.CTkButton(
+            master,
+            text="",
+            anchor="w",
+            fg_color="transparent",
+            text_color=theme.TEXT_COLOR,
+            hover_color=theme.FG_COLOR
+        )
+        btn.entry = None
+        btn.root = None
+        btn.path = None
+        btn.file_font = btn.cget("font")
+        btn.configure(command=lambda b=btn: self.on_file_row_clicked(b))
+        return btn
+
+    def bind_file_row(self, btn, index):
+        root, fpath = self.shown_files[index]
+        if fpath is None:
+            # Folder heading: the active root is highlighted
+            entry = (root, None, self.shown_counts.get(root, 0), root == self.current_folder)
+        else:
+            entry = (root, fpath)
+        if btn.entry == entry:
+            return
+        btn.entry = entry
+        btn.root = root
+        btn.path = fpath
+        if fpath is None:
+            name = os.path.basename(os.path.normpath(root)) or root
+            btn.configure(
+                text=f"{name} ({entry[2]})",
+                font=("Arial", 13, "bold"),
+                text_color=theme.ACCENT_COLOR if entry[3] else theme.TEXT_SECONDARY_COLOR
             )
-            btn.pack(fill="x", pady=2)
+            return
+        # Create relative path for display
+        try:
+            rel_path = os.path.relpath(fpath, root)
+        except:
+            rel_path = os.path.basename(fpath)
+        btn.configure(text="   " + rel_path, font=btn.file_font, text_color=theme.TEXT_COLOR)
+
+    def on_file_row_clicked(self, btn):
+        if btn.path is None:
+            # Switching instances is instant: every root is already scanned and indexed
+            self.set_active_root(btn.root)
+        else:
+            self.open_file(btn.path)
+
+    def tab_name_for(self, file_path):
+        # Tabs are named after the file; the same name from another root (every server
+        # has a config.ini) gets the root's folder name in front of its relative path
+        for name, editor in self.editors.items():
+            if editor.file_path == file_path:
+                return name
+        name = os.path.basename(file_path)
+        if name not in self.editors:
+            return name
+        root = self.file_roots.get(file_path)
+        if root is None:
+            return file_path
+        return os.path.relpath(file_path, os.path.dirname(os.path.normpath(root)))
 
     def open_file(self, file_path):
         # Check if tab exists
-        tab_name = os.path.basename(file_path)
+        tab_name = self.tab_name_for(file_path)
         
         # CTkTabview doesn't easily expose list of tabs to check existence by name safely without error
         # So handle try/except
@@ -217,19 +642,205 @@ class App(ctk.CTk):
             
             # Create EditorView inside the tab
             # tab_view.tab(name) returns the frame for that tab
+            from ui.editor_view import EditorView
             editor = EditorView(
                 self.tab_view.tab(tab_name), 
                 file_path,
+                self.save_queue,
+                self.post_to_ui,
                 close_callback=lambda: self.close_tab(tab_name),
-                search_query=self.search_entry.get()
+                save_callback=self.on_file_saved,
+                search_matcher=self.current_matcher(),
+                edit_log=self.reusable_edit_log(file_path)
             )
             editor.pack(fill="both", expand=True)
+            self.editors[tab_name] = editor
+            self.edit_logs[file_path] = editor.log
             
         except ValueError:
             # Tab likely already exists
             pass
         
         self.tab_view.set(tab_name)
+        # set() doesn't fire the tab view command
+        self.on_tab_changed()
+
+    def compare_folder_dialog(self):
+        if not self.current_folder:
+            return
+        other = ctk.filedialog.askdirectory(title="Select Folder To Compare With")
+        if other:
+            self.compare_folders(self.current_folder, other)
+
+    def compare_folders(self, left_root, right_root):
+        tab_name = "Compare: " + os.path.basename(os.path.normpath(right_root))
+        if tab_name in self.editors or tab_name in self.compare_views:
+            self.close_tab(tab_name)
+        self.tab_view.add(tab_name)
+        import folder_diff
+        from ui.compare_view import CompareView
+        view = CompareView(
+            self.tab_view.tab(tab_name),
+            left_root,
+            right_root,
+            close_callback=lambda: self.close_tab(tab_name),
+            open_callback=self.open_file
+        )
+        view.pack(fill="both", expand=True)
+        self.compare_views[tab_name] = view
+        self.tab_view.set(tab_name)
+
+        left_files = list(self.root_files[left_root]) if left_root in self.root_files else None
+
+        def run():
+            start = time.perf_counter()
+            try:
+                results = folder_diff.compare_folders(left_root, right_root, left_files=left_files)
+            except Exception as e:
+                self.post_to_ui(view.show_error, str(e))
+                return
+            self.post_to_ui(view.show_results, results, time.perf_counter() - start)
+
+        threading.Thread(target=run, name="FolderCompare", daemon=True).start()
+
+    def open_replace_view(self):
+        if not self.current_folder:
+            return
+        if self.replace_view is not None and self.replace_view.root != self.current_folder:
+            self.close_tab(REPLACE_TAB)
+        if self.replace_view is None:
+            from ui.replace_view import ReplaceView
+            root = self.current_folder
+            self.tab_view.add(REPLACE_TAB)
+            self.replace_view = ReplaceView(
+                self.tab_view.tab(REPLACE_TAB),
+                root,
+                lambda: self.root_files.get(root, []),
+                self.post_to_ui,
+                fsync=self.settings.get_fsync_on_save(),
+                close_callback=lambda: self.close_tab(REPLACE_TAB),
+                open_callback=self.open_file,
+                before_apply=self.check_replace_targets,
+                after_apply=self.on_replace_applied
+            )
+            self.replace_view.pack(fill="both", expand=True)
+        self.tab_view.set(REPLACE_TAB)
+        self.replace_view.find_entry.focus_set()
+
+    def reusable_edit_log(self, file_path):
+        # A log from a closed tab still applies if the file hasn't changed since
+        from file_cache import file_cache
+        log = self.edit_logs.get(file_path)
+        if log is None:
+            return None
+        try:
+            if log.stat_key == file_cache.stat_key(file_path):
+                return log
+        except OSError:
+            pass
+        del self.edit_logs[file_path]
+        return None
+
+    def undo_edit(self, event):
+        editor = self.editor_for_event(event)
+        if editor is not None:
+            editor.undo()
+
+    def redo_edit(self, event):
+        editor = self.editor_for_event(event)
+        if editor is not None:
+            editor.redo()
+
+    def editor_for_event(self, event):
+        # The shortcuts are bound on the window, so they also fire while typing in the
+        # search box or the Find & Replace fields; only act when the key went to the editor
+        editor = self.current_editor()
+        if editor is None:
+            return None
+        widget, name = str(event.widget), str(editor)
+        if widget == name or widget.startswith(name + "."):
+            return editor
+        return None
+
+    def check_replace_targets(self, paths):
+        # Files with unsaved edits or a save in flight would overwrite (or be overwritten by) the replace
+        paths = set(paths)
+        for path, log in self.edit_logs.items():
+            if path in paths and log.edits:
+                return f"Save or undo the changes in {os.path.basename(path)} first"
+        for path in paths:
+            if self.save_queue.is_busy(path):
+                return f"{os.path.basename(path)} is still being saved"
+        return None
+
+    def on_replace_applied(self, paths):
+        from file_cache import file_cache
+        paths = set(paths)
+        for path in paths:
+            file_cache.invalidate(path)
+            self.search_worker.update_file(path)
+        # Open tabs still show the old contents: reopen them from disk
+        for tab_name, editor in list(self.editors.items()):
+            if editor.file_path in paths:
+                self.close_tab(tab_name)
+                self.open_file(editor.file_path)
+        self.tab_view.set(REPLACE_TAB)
 
     def close_tab(self, tab_name):
+        if tab_name == REPLACE_TAB:
+            self.replace_view = None
+        self.compare_views.pop(tab_name, None)
+        self.editors.pop(tab_name, None)
+        self.tab_last_used.pop(tab_name, None)
         self.tab_view.delete(tab_name)
+        # Another tab may have become current
+        self.on_tab_changed()
+
+    def current_editor(self):
+        try:
+            return self.editors.get(self.tab_view.get())
+        except Exception:
+            # No tab selected
+            return None
+
+    def on_tab_changed(self):
+        tab_name = self.tab_view.get()
+        editor = self.editors.get(tab_name)
+        if editor is None:
+            return
+        editor.wake()
+        self.tab_last_used[tab_name] = time.monotonic()
+        self.hibernate_tabs()
+
+    def hibernate_tabs(self):
+        # Keep at most max_live_tabs editors with live widgets, and none that sat idle too long
+        current = self.tab_view.get()
+        idle_limit = time.monotonic() - self.settings.get_tab_idle_seconds()
+        live = [name for name, editor in self.editors.items() if not editor.hibernated and name != current]
+        live.sort(key=lambda name: self.tab_last_used.get(name, 0))
+
+        excess = len(live) + 1 - self.settings.get_max_live_tabs()
+        for name in live:
+            if excess > 0 or self.tab_last_used.get(name, 0) < idle_limit:
+                self.editors[name].hibernate()
+                excess -= 1
+
+    def toggle_perf_bar(self):
+        if self.perf_bar is not None and self.perf_bar.running:
+            self.perf_bar.stop()
+            self.perf_bar.grid_forget()
+            self.settings.set_show_perf_bar(False)
+        else:
+            self.show_perf_bar()
+            self.settings.set_show_perf_bar(True)
+
+    def show_perf_bar(self):
+        if self.perf_bar is None:
+            from ui.perf_bar import PerfBar
+            self.perf_bar = PerfBar(self, lambda: self.editors)
+        self.perf_bar.grid(row=1, column=0, columnspan=2, sticky="ew")
+        self.perf_bar.start()
+
+    def check_idle_tabs(self):
+        self.hibernate_tabs()
+        self.after(HIBERNATE_CHECK_MS, self.check_idle_tabs)
@@ -0,0 +1,147 @@
+import customtkinter as ctk
+import sys
+import os
+
+# Allow importing from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import folder_diff
+import theme
+from ui.virtual_list import VirtualList
+
+ROW_HEIGHT = 26
+
+STATUS_COLORS = {
+    folder_diff.STATUS_CHANGED: theme.HIGHLIGHT_COLOR,
+    folder_diff.STATUS_ADDED: "#43b581",   # Green
+    folder_diff.STATUS_REMOVED: "#f04747", # Red
+    folder_diff.STATUS_ERROR: "#f04747",
+    folder_diff.STATUS_UNCHANGED: theme.TEXT_SECONDARY_COLOR,
+}
+
+class CompareView(ctk.CTkFrame):
+    # Shows the result of folder_diff.compare_folders: one row per file, followed by
+    # its added (+), removed (-) and changed (~) keys.
+
+    def __init__(self, master, left_root, right_root, close_callback=None, open_callback=None, **kwargs):
+        super().__init__(master, fg_color=theme.FG_COLOR, corner_radius=10, **kwargs)
+        self.left_root = left_root
+        self.right_root = right_root
+        self.close_callback = close_callback
+        self.open_callback = open_callback
+        self.results = []
+        self.rows = [] # Flattened display rows: (kind, text, color, FileDiff)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        # Header
+        self.header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.header_frame.pack(fill="x", padx=10, pady=(10, 5))
+
+        self.title_label = ctk.CTkLabel(
+            self.header_frame,
+            text=f"{self.left_root}  ↔  {self.right_root}",
+            font=("Arial", 16, "bold"),
+            text_color=theme.TEXT_COLOR,
+            anchor="w"
+        )
+        self.title_label.pack(side="left")
+
+        if self.close_callback:
+            self.close_button = ctk.CTkButton(
+                self.header_frame,
+                text="Close",
+                command=self.close_callback,
+                fg_color="#f04747",
+                hover_color="#d84040",
+                text_color=theme.TEXT_COLOR,
+                height=30,
+                width=80,
+                corner_radius=6
+            )
+            self.close_button.pack(side="right", padx=(10, 0))
+
+        self.changes_only = ctk.CTkCheckBox(
+            self.header_frame,
+            text="Changes only",
+            command=self.rebuild_rows,
+            fg_color=theme.ACCENT_COLOR,
+            hover_color=theme.HOVER_COLOR,
+            text_color=theme.TEXT_COLOR
+        )
+        self.changes_only.select()
+        self.changes_only.pack(side="right")
+
+        self.summary_label = ctk.CTkLabel(self, text="Comparing...", anchor="w", text_color=theme.TEXT_SECONDARY_COLOR)
+        self.summary_label.pack(fill="x", padx=15)
+
+        # Separator (visual)
+        self.separator = ctk.CTkFrame(self, height=2, fg_color=theme.ACCENT_COLOR)
+        self.separator.pack(fill="x", padx=10, pady=5)
+
+        self.row_list = VirtualList(
+            self,
+            row_height=ROW_HEIGHT,
+            create_row=self.create_row,
+            bind_row=self.bind_row
+        )
+        self.row_list.pack(fill="both", expand=True, padx=5, pady=5)
+
+    def show_results(self, results, seconds=None):
+        self.results = results
+        counts = {}
+        for result in results:
+            counts[result.status] = counts.get(result.status, 0) + 1
+        summary = ", ".join(f"{counts[s]} {s}" for s in sorted(counts)) or "No files"
+        if seconds is not None:
+            summary += f"  ({seconds:.2f}s)"
+        self.summary_label.configure(text=summary)
+        self.rebuild_rows()
+
+    def show_error(self, message):
+        self.summary_label.configure(text=f"Compare failed: {message}", text_color="#f04747")
+
+    def rebuild_rows(self):
+        changes_only = self.changes_only.get()
+        rows = []
+        for result in self.results:
+            if changes_only and result.status == folder_diff.STATUS_UNCHANGED:
+                continue
+            label = f"[{result.status}] {result.rel_path}"
+            if result.status == folder_diff.STATUS_CHANGED:
+                label += f"  ({result.key_change_count()} keys)"
+            elif result.status == folder_diff.STATUS_ERROR:
+                label += f"  {result.error}"
+            rows.append(('file', label, STATUS_COLORS[result.status], result))
+
+            for key in sorted(result.added):
+                rows.append(('key', f"+ {key} = {result.added[key]}", STATUS_COLORS[folder_diff.STATUS_ADDED], result))
+            for key in sorted(result.removed):
+                rows.append(('key', f"- {key} = {result.removed[key]}", STATUS_COLORS[folder_diff.STATUS_REMOVED], result))
+            for key in sorted(result.changed):
+                left, right = result.changed[key]
+                rows.append(('key', f"~ {key}: {left}  →  {right}", theme.TEXT_COLOR, result))
+        self.rows = rows
+        self.row_list.set_count(len(rows), reset=True)
+
+    def create_row(self, master):
+        label = ctk.CTkLabel(master, text="", anchor="w", justify="left")
+        label.result = None
+        # Double-click a file row to open the left-hand copy in the editor
+        label.bind("<Double-Button-1>", lambda e, l=label: self.on_row_opened(l))
+        return label
+
+    def bind_row(self, label, index):
+        kind, text, color, result = self.rows[index]
+        label.result = result
+        if kind == 'file':
+            label.configure(text=text, text_color=color, font=("Arial", 13, "bold"), padx=5)
+        else:
+            label.configure(text=text, text_color=color, font=("Consolas", 12), padx=30)
+
+    def on_row_opened(self, label):
+        result = label.result
+        if result is None or not self.open_callback or result.status == folder_diff.STATUS_ADDED:
+            return
+        self.open_callback(os.path.join(self.left_root, result.rel_path))
@@ -5,28 +5,61 @@ import os
 # Allow importing from parent directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config_parser import ConfigFile, ConfigLine
+from config_parser import ConfigLine
+from edit_log import EditLog
+from file_cache import file_cache
+import profiling
+import schema
+import search_matcher
 import theme
+from ui.virtual_list import VirtualList
+
+ROW_HEIGHT = 40
+ERROR_COLOR = "#f04747"
 
 class EditorView(ctk.CTkFrame):
-    def __init__(self, master, file_path, close_callback=None, search_query="", **kwargs):
+    def __init__(self, master, file_path, save_queue, post, close_callback=None, save_callback=None, search_matcher=None, edit_log=None, **kwargs):
         super().__init__(master, fg_color=theme.FG_COLOR, corner_radius=10, **kwargs)
         self.file_path = file_path
+        self.save_queue = save_queue
+        self.post = post # Runs a callback on the UI thread (App.post_to_ui)
         self.close_callback = close_callback
-        self.initial_search_query = search_query
-        self.config_file = ConfigFile()
-        self.config_file.load(file_path)
-        self.entry_map = {} # Maps key to (EntryWidget, OriginalValue)
-        self.label_map = {} # Maps key to LabelWidget
-        self.comment_labels = []
-        self.header_labels = []
+        self.save_callback = save_callback
+        self.initial_search_matcher = search_matcher
+        # Shared, parsed copy: reopening a recently closed tab doesn't touch the disk
+        self.config_file = file_cache.get(file_path)
+        self.rows = [] # Maps display row to (kind, line index, display text)
+        self.line_rows = None # Maps line index to display row, built on the first undo/redo
+        # Undo/redo history; a log from an earlier tab on the same, unchanged file carries its edits over
+        if edit_log is None:
+            edit_log = EditLog(None, file_cache.stat_key(file_path))
+        config_file = self.config_file # Not self: a log kept after the tab closes mustn't hold the widgets
+        edit_log.saved_value = lambda line_index: config_file.lines[line_index].value
+        self.log = edit_log
+        self.edits = edit_log.edits # Maps line index to the unsaved value typed by the user
+        self.schema = schema.get_schema()
+        self.invalid = {} # Maps edited line index to why its value is rejected; blocks saving
+        for line_index, value in self.edits.items():
+            self.validate_edit(line_index, value)
+        self.matcher = None # Compiled search_matcher.Matcher of the current search, shared with the App
+        self.search_key = None # (mode, query) of the current search
+        self.key_matches = set() # Display rows whose key/comment/header text matches
+        self.value_matches = set() # Display rows whose value matches
+        self.row_count = None # Set once the display model has been built
+        self.text_lower = None # Lowercase display text per row, built on the first search
+        self.value_lower = None # Maps key/value row to its lowercase current value
+        self.match_list = [] # Sorted rows matching the current search
+        self.match_pos = -1 # Position in match_list of the selected match
+        self.hibernated = False # Widgets destroyed to save memory; model and edits are kept
+        self.saved_top = 0
+        self.restore_pending = False # saved_top came from a restored workspace and isn't applied yet
 
         self.setup_ui()
         
         # Apply initial highlight if query exists
-        if self.initial_search_query:
+        if self.initial_search_matcher:
              # Delay slightly to ensure widgets are rendered/packed? Not strictly necessary in tkinter usually but good for scroll
-             self.after(100, lambda: self.highlight_search(self.initial_search_query))
+             self.after(100, lambda: self.highlight_search(self.initial_search_matcher))
 
     def setup_ui(self):
         # Header
@@ -71,224 +104,548 @@ class EditorView(ctk.CTkFrame):
         )
         self.save_button.pack(side="right")
 
+        # Undo / redo (also Ctrl+Z / Ctrl+Y)
+        self.redo_button = ctk.CTkButton(
+            self.buttons_frame,
+            text="\u21b7",
+            command=self.redo,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.HOVER_COLOR,
+            text_color=theme.TEXT_COLOR,
+            height=30,
+            width=30,
+            corner_radius=6
+        )
+        self.redo_button.pack(side="right", padx=(0, 10))
+
+        self.undo_button = ctk.CTkButton(
+            self.buttons_frame,
+            text="\u21b6",
+            command=self.undo,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.HOVER_COLOR,
+            text_color=theme.TEXT_COLOR,
+            height=30,
+            width=30,
+            corner_radius=6
+        )
+        self.undo_button.pack(side="right", padx=(0, 2))
+        self.update_history_buttons()
+
+        # Search match navigation
+        self.next_button = ctk.CTkButton(
+            self.buttons_frame,
+            text="\u25bc",
+            command=self.next_match,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.HOVER_COLOR,
+            text_color=theme.TEXT_COLOR,
+            height=30,
+            width=30,
+            corner_radius=6
+        )
+        self.next_button.pack(side="right", padx=(0, 10))
+
+        self.prev_button = ctk.CTkButton(
+            self.buttons_frame,
+            text="\u25b2",
+            command=self.prev_match,
+            fg_color=theme.FG_COLOR,
+            hover_color=theme.HOVER_COLOR,
+            text_color=theme.TEXT_COLOR,
+            height=30,
+            width=30,
+            corner_radius=6
+        )
+        self.prev_button.pack(side="right", padx=(0, 2))
+
+        self.match_label = ctk.CTkLabel(self.buttons_frame, text="", text_color=theme.TEXT_SECONDARY_COLOR)
+        self.match_label.pack(side="right", padx=(0, 5))
+        self.update_match_label()
+
         # Separator (visual)
         self.separator = ctk.CTkFrame(self, height=2, fg_color=theme.ACCENT_COLOR)
         self.separator.pack(fill="x", padx=10, pady=5)
 
-        # Scrollable content area
-        self.scroll_frame = ctk.CTkScrollableFrame(
-            self, 
-            fg_color="transparent", 
-            scrollbar_button_color=theme.ACCENT_COLOR,
-            scrollbar_button_hover_color=theme.HOVER_COLOR
+        # Virtualized content area: only the visible rows have widgets
+        if self.row_count is None:
+            self.populate_rows()
+        else:
+            # Waking up from hibernation: the display model is still there
+            self.build_row_list()
+
+    def populate_rows(self):
+        # Build the display model only; widgets are created lazily by the VirtualList
+        with profiling.span("populate", path=self.file_path) as info:
+            if self.config_file.lazy:
+                # Huge files: one row per line, classified on demand so lines stay unparsed until shown
+                self.rows = None
+                self.row_count = len(self.config_file.lines)
+                self.key_width = 250
+            else:
+                self.rows = []
+                rows = [self.describe_line(i, line) for i, line in enumerate(self.config_file.lines)]
+                self.rows = [row for row in rows if row is not None]
+                self.row_count = len(self.rows)
+                max_key_len = max((len(text) for kind, i, text in self.rows if kind == 'kv'), default=0)
+                # Rows are independent frames, so give the key column a shared fixed width
+                self.key_width = min(max(150, max_key_len * 9), 400)
+
+            self.build_row_list()
+            info["rows"] = self.row_count
+
+    def build_row_list(self):
+        self.row_list = VirtualList(
+            self,
+            row_height=ROW_HEIGHT,
+            create_row=self.create_row,
+            bind_row=self.bind_row
         )
-        self.scroll_frame.pack(fill="both", expand=True, padx=5, pady=5)
+        self.row_list.pack(fill="both", expand=True, padx=5, pady=5)
+        self.row_list.set_count(self.row_count, reset=True)
 
-        # Populate rows
-        self.populate_rows()
+    def hibernate(self):
+        # Drop the whole widget tree but keep the parsed file, unsaved edits and search state
+        if self.hibernated:
+            return
+        if not self.restore_pending:
+            self.saved_top = self.row_list.top
+        for child in self.winfo_children():
+            child.destroy()
+        self.hibernated = True
 
-    def populate_rows(self):
-        row_idx = 0
-        for line in self.config_file.lines:
-            if line.type == ConfigLine.TYPE_KEY_VALUE:
-                self.create_key_value_row(line, row_idx)
-                row_idx += 1
-            elif line.type == ConfigLine.TYPE_COMMENT:
-                # Optionally show comments, but to keep it clean maybe just show as specific label 
-                # or simplified view. For now let's just show key/values to edit.
-                # If we want to be fancy we could interleave comments.
-                # Let's try to add them as small text labels if they are standalone?
-                # Actually user requirement is just "read and edit". Clean editing is better.
-                # But context is important. Let's add comments as small gray labels.
-                
-                # Check if it's a section header style comment "### MISC ###"
-                if "###" in line.raw_line:
-                     self.create_section_header(line.raw_line, row_idx)
-                     row_idx += 1
-                else:
-                     # Regular comment
-                     self.create_comment_row(line.raw_line, row_idx)
-                     row_idx += 1
-            elif line.type == ConfigLine.TYPE_WHITESPACE:
-                 # Add a small spacer
-                 spacer = ctk.CTkFrame(self.scroll_frame, height=10, fg_color="transparent")
-                 spacer.grid(row=row_idx, column=0, columnspan=2, sticky="ew")
-                 row_idx += 1
-
-    def create_key_value_row(self, line_obj, row_idx):
-        # Key Label
-        key_label = ctk.CTkLabel(
-            self.scroll_frame,
-            text=line_obj.key,
+    def wake(self):
+        if not self.hibernated:
+            return
+        self.hibernated = False
+        self.setup_ui()
+        # Restore the scroll position once the list has its real size
+        self.restore_pending = True
+        self.after_idle(self.apply_saved_top)
+
+    def apply_saved_top(self):
+        if self.hibernated or not self.restore_pending:
+            return
+        self.restore_pending = False
+        self.row_list.scroll_to_pixel(self.saved_top)
+
+    def scroll_top(self):
+        return self.saved_top if self.hibernated or self.restore_pending else self.row_list.top
+
+    def restore_position(self, top):
+        # Scroll offset from a restored workspace; applied once the list has its real size
+        self.saved_top = top
+        self.restore_pending = True
+        if not self.hibernated:
+            self.after_idle(self.apply_saved_top)
+
+    def describe_line(self, line_index, line):
+        # Returns (kind, line index, display text), or None for lines that aren't shown
+        if line.type == ConfigLine.TYPE_KEY_VALUE:
+            return ('kv', line_index, line.key)
+        elif line.type == ConfigLine.TYPE_COMMENT:
+            # Comments give context, so show them as small gray labels.
+            # Check if it's a section header style comment "### MISC ###"
+            if "###" in line.raw_line:
+                return ('header', line_index, line.raw_line.strip().replace("#", "").strip())
+            return ('comment', line_index, line.raw_line.strip())
+        elif line.type == ConfigLine.TYPE_WHITESPACE:
+            return ('blank', line_index, "")
+        elif self.rows is None:
+            # Lazy mode needs a row for every line
+            return ('comment', line_index, line.raw_line.strip())
+        return None
+
+    def row_info(self, index):
+        if self.rows is not None:
+            return self.rows[index]
+        return self.describe_line(index, self.config_file.lines[index])
+
+    def create_row(self, master):
+        row = ctk.CTkFrame(master, fg_color="transparent", corner_radius=0)
+        row.grid_columnconfigure(0, minsize=self.key_width)
+        row.grid_columnconfigure(1, weight=1)
+        row.kind = None
+        row.index = None
+        row.line_index = None
+        row.binding = False
+
+        row.key_label = ctk.CTkLabel(
+            row,
+            text="",
             anchor="w",
             text_color=theme.TEXT_COLOR,
             font=("Arial", 14)
         )
-        key_label.grid(row=row_idx, column=0, padx=10, pady=5, sticky="w")
 
-        # Value Entry
-        value_entry = ctk.CTkEntry(
-            self.scroll_frame,
+        row.value_var = ctk.StringVar()
+        row.value_entry = ctk.CTkEntry(
+            row,
+            textvariable=row.value_var,
             border_color=theme.ACCENT_COLOR,
             fg_color=theme.BG_COLOR,
             text_color=theme.TEXT_COLOR,
             width=300
         )
-        value_entry.insert(0, line_obj.value)
-        value_entry.grid(row=row_idx, column=1, padx=10, pady=5, sticky="ew")
-        
-        # Expand column 1
-        self.scroll_frame.grid_columnconfigure(1, weight=1)
+        # Catch every change (typing, paste, cut) so edits survive row recycling
+        row.value_var.trace_add("write", lambda *args, r=row: self.on_entry_changed(r))
 
-        self.entry_map[line_obj.key] = value_entry
-        self.label_map[line_obj.key] = key_label
+        row.text_label = ctk.CTkLabel(row, text="", anchor="w", justify="left")
+        return row
 
-    def highlight_search(self, query):
-        query = query.lower()
-        first_match = None
-        
-        # Helper to reset/highlight label
-        def check_label(label, text):
-            if query and query in text.lower():
-                label.configure(text_color=theme.HIGHLIGHT_COLOR)
-                return True
+    def set_row_kind(self, row, kind):
+        if row.kind == kind:
+            return
+        row.kind = kind
+        for widget in (row.key_label, row.value_entry, row.text_label):
+            widget.grid_forget()
+
+        if kind == 'kv':
+            row.key_label.grid(row=0, column=0, padx=10, pady=5, sticky="w")
+            row.value_entry.grid(row=0, column=1, padx=10, pady=5, sticky="ew")
+        elif kind == 'comment':
+            row.text_label.configure(font=("Arial", 12, "italic"))
+            row.text_label.grid(row=0, column=0, columnspan=2, padx=20, pady=2, sticky="w")
+        elif kind == 'header':
+            row.text_label.configure(font=("Arial", 16, "bold"))
+            row.text_label.grid(row=0, column=0, columnspan=2, padx=10, pady=(10, 0), sticky="w")
+
+    def bind_row(self, row, index):
+        if row.index != index and row.kind == 'kv':
+            self.release_focus(row)
+        kind, line_index, text = self.row_info(index)
+        self.set_row_kind(row, kind)
+        row.index = index
+        row.line_index = line_index
+
+        if kind == 'kv':
+            row.key_label.configure(text=text)
+            row.binding = True
+            row.value_var.set(self.current_value(line_index))
+            row.binding = False
+        elif kind in ('comment', 'header'):
+            row.text_label.configure(text=text)
+        self.apply_highlight(row, index)
+
+    def release_focus(self, row):
+        # A recycled row must not take the caret along to another line, or typing
+        # would go into that line. CTkEntry focuses its inner tk entry, a child widget.
+        try:
+            focused = self.focus_get()
+        except KeyError:
+            return
+        entry = str(row.value_entry)
+        if focused is not None and (str(focused) == entry or str(focused).startswith(entry + ".")):
+            self.focus_set()
+
+    def apply_highlight(self, row, index):
+        # Only touches colors, so it is safe on a row whose entry is being edited
+        if row.kind == 'kv':
+            row.key_label.configure(text_color=theme.HIGHLIGHT_COLOR if index in self.key_matches else theme.TEXT_COLOR)
+            row.value_entry.configure(
+                text_color=theme.HIGHLIGHT_COLOR if index in self.value_matches else theme.TEXT_COLOR,
+                border_color=ERROR_COLOR if row.line_index in self.invalid else theme.ACCENT_COLOR
+            )
+        elif row.kind in ('comment', 'header'):
+            if index in self.key_matches:
+                color = theme.HIGHLIGHT_COLOR
+            elif row.kind == 'header':
+                color = theme.ACCENT_COLOR
             else:
-                label.configure(text_color=theme.TEXT_COLOR if label not in self.header_labels else theme.ACCENT_COLOR) # Restore defaults
-                # Note: header default is ACCENT_COLOR, comment is TEXT_SECONDARY_COLOR. 
-                # This simple restore might overwrite specific colors.
-                # Better to store original color?
-                # Or just check label type/list.
-                return False
-
-        # Reset and check keys
-        for key, label in self.label_map.items():
-            is_match = False
-            if query and query in key.lower():
-                label.configure(text_color=theme.HIGHLIGHT_COLOR)
-                is_match = True
+                color = theme.TEXT_SECONDARY_COLOR
+            row.text_label.configure(text_color=color)
+
+    def current_value(self, line_index):
+        if line_index in self.edits:
+            return self.edits[line_index]
+        return self.config_file.lines[line_index].value
+
+    def on_entry_changed(self, row):
+        if row.binding or row.line_index is None:
+            return
+        value = row.value_var.get()
+        old = self.current_value(row.line_index)
+        if value == old:
+            return
+        self.log.record(row.line_index, old, value)
+        self.update_history_buttons()
+        if self.validate_edit(row.line_index, value):
+            self.apply_highlight(row, row.index)
+        self.update_row_match(row.index, value)
+
+    def validate_edit(self, line_index, value):
+        # Checks one edited value against the schema; returns True if its valid state flipped.
+        # A value that is back to what's on disk is not an edit and is never rejected.
+        message = None
+        if line_index in self.edits:
+            message = self.schema.validate(self.config_file.lines[line_index].key, value)
+        was_invalid = line_index in self.invalid
+        if message:
+            self.invalid[line_index] = message
+        else:
+            self.invalid.pop(line_index, None)
+        return was_invalid != bool(message)
+
+    def update_row_match(self, index, value):
+        # Keep the lowercase cache and this row's match state current after its value changed
+        if self.value_lower is not None:
+            self.value_lower[index] = value.lower()
+        if self.matcher and self.text_lower is not None:
+            key_matches, value_matches = self.match_rows(self.matcher, [index])
+            changed = False
+            for matches, now in ((self.key_matches, key_matches), (self.value_matches, value_matches)):
+                if (index in matches) != (index in now):
+                    if index in now:
+                        matches.add(index)
+                    else:
+                        matches.discard(index)
+                    changed = True
+            if changed:
+                self.update_match_list()
+                if not self.hibernated:
+                    row = self.row_list.visible_rows().get(index)
+                    if row is not None:
+                        self.apply_highlight(row, index)
+
+    def row_for_line(self, line_index):
+        if self.rows is None:
+            return line_index # Lazy mode: one row per line
+        if self.line_rows is None:
+            self.line_rows = {line: index for index, (kind, line, text) in enumerate(self.rows)}
+        return self.line_rows.get(line_index)
+
+    def undo(self):
+        self.apply_history(self.log.undo())
+
+    def redo(self):
+        self.apply_history(self.log.redo())
+
+    def apply_history(self, step):
+        # Show the value restored by undo/redo; the log has already updated self.edits
+        if step is None:
+            return
+        self.update_history_buttons()
+        line_index, value = step
+        self.validate_edit(line_index, value)
+        index = self.row_for_line(line_index)
+        if index is None:
+            return
+        self.update_row_match(index, value)
+        if not self.hibernated:
+            self.row_list.scroll_to(index)
+            self.row_list.refresh([index])
+
+    def update_history_buttons(self):
+        if self.hibernated:
+            return
+        self.undo_button.configure(state="normal" if self.log.can_undo() else "disabled")
+        self.redo_button.configure(state="normal" if self.log.can_redo() else "disabled")
+
+    def build_text_cache(self):
+        # Lowercase text per display row, computed once and reused for every keystroke
+        self.text_lower = []
+        self.value_lower = {}
+        lazy_lines = self.config_file.lines if self.rows is None else None
+        for index in range(self.row_count):
+            if lazy_lines is not None:
+                # Lazy files: keep only the strings, not a parsed line per row
+                line = lazy_lines.peek(index)
+                kind, line_index, text = self.describe_line(index, line)
+                value = self.edits.get(line_index, line.value) if kind == 'kv' else None
             else:
-                label.configure(text_color=theme.TEXT_COLOR)
-            
-            if is_match and not first_match: first_match = label
-                
-        # Reset and check values
-        for key, entry in self.entry_map.items():
-            val = entry.get().lower()
-            if query and query in val:
-                entry.configure(text_color=theme.HIGHLIGHT_COLOR)
-                if not first_match: first_match = entry
+                kind, line_index, text = self.row_info(index)
+                value = self.current_value(line_index) if kind == 'kv' else None
+            self.text_lower.append(text.lower() if kind != 'blank' else "")
+            if kind == 'kv':
+                self.value_lower[index] = value.lower()
+
+    def match_rows(self, matcher, rows=None):
+        # Returns (key_matches, value_matches) among the given display rows (default: all)
+        text_lower = self.text_lower
+        value_lower = self.value_lower
+        if rows is None:
+            key_rows = None
+            value_rows = value_lower.keys()
+        else:
+            key_rows = rows
+            value_rows = [i for i in rows if i in value_lower]
+
+        if matcher.searches_keys():
+            matches = matcher.matching_keys({i: text_lower[i] for i in value_rows}, value_lower)
+            # A value condition ("*Rate > 1") highlights the value as well
+            return matches, (set(matches) if matcher.value_op else set())
+        if matcher.mode in (search_matcher.MODE_REGEX, search_matcher.MODE_WORD):
+            return self.match_lines(matcher, rows)
+        value_matches = matcher.matching_indices(value_lower, value_rows)
+        if matcher.mode == search_matcher.MODE_VALUE:
+            return set(), value_matches
+        return matcher.matching_indices(text_lower, key_rows), value_matches
+
+    def match_lines(self, matcher, rows=None):
+        # Regex/word queries run over whole "key = value" lines, as the file filter sees them
+        # (e.g. port\s*=\s*80\d\d); the part of the row that matches on its own gets highlighted
+        text_lower = self.text_lower
+        value_lower = self.value_lower
+        if rows is None:
+            rows = range(self.row_count)
+        lines = {}
+        for i in rows:
+            value = value_lower.get(i)
+            lines[i] = text_lower[i] if value is None else f"{text_lower[i]} = {value}"
+        key_matches = set()
+        value_matches = set()
+        search = matcher.pattern.search
+        for i in matcher.matching_indices(lines, lines.keys()):
+            if i in value_lower and search(value_lower[i]):
+                value_matches.add(i)
+                if search(text_lower[i]):
+                    key_matches.add(i)
             else:
-                entry.configure(text_color=theme.TEXT_COLOR)
-        
-        # Check comments
-        for label in self.comment_labels:
-            if query and query in label.cget("text").lower():
-                label.configure(text_color=theme.HIGHLIGHT_COLOR)
-                if not first_match: first_match = label
+                key_matches.add(i)
+        return key_matches, value_matches
+
+    def highlight_search(self, matcher):
+        # Matching runs over the model, so it covers rows that currently have no widgets
+        search_key = matcher.cache_key()
+        if search_key == self.search_key:
+            # e.g. Enter for match navigation also fires a search; keep the selected match
+            return
+        old_matcher = self.matcher
+        old_key_matches = self.key_matches
+        old_value_matches = self.value_matches
+
+        with profiling.span("highlight", path=self.file_path, mode=matcher.mode) as info:
+            if not matcher:
+                key_matches = set()
+                value_matches = set()
             else:
-                label.configure(text_color=theme.TEXT_SECONDARY_COLOR)
-
-        # Check headers
-        for label in self.header_labels:
-             # Header text might be modified (stripped), check displayed text
-             if query and query in label.cget("text").lower():
-                label.configure(text_color=theme.HIGHLIGHT_COLOR)
-                if not first_match: first_match = label
-             else:
-                label.configure(text_color=theme.ACCENT_COLOR)
-
-        if first_match:
-             # Scroll to match without focusing (to keep search box active)
-             try:
-                # CTkScrollableFrame uses a canvas internally.
-                # We need to calculate the position of the widget relative to the scrollable content.
-                
-                # Force update to ensure coordinates are calculated
-                self.update_idletasks()
-                
-                # Get widget y position relative to the scrollable frame content
-                widget_y = first_match.winfo_y()
-                
-                # Get total height of the content
-                # self.scroll_frame.winfo_children()[0] is usually the internal frame containing widgets?
-                # Actually CustomTkinter architecture puts widgets in self.scroll_frame
-                # But self.scroll_frame is a CTkScrollableFrame, which has ._parent_canvas and ._parent_frame (the content)
-                
-                # The widgets are grid/packed into self.scroll_frame (which acts as the frame).
-                # But correctly, the content frame is usually accessible via a property or by inspection.
-                # In CTK 5.x, self.scroll_frame IS the frame you pack into? No.
-                # Let's rely on calculating fraction based on widget_y / total_height
-                
-                # Total height of the scrollable content
-                # This is tricky without internal access, but .winfo_height() of the frame should work if it's fully expanded?
-                # No, scroll frame height is the visible height.
-                # The scroll region is in the canvas.
-                
-                scroll_region = self.scroll_frame._parent_canvas.bbox("all")
-                if scroll_region:
-                    content_height = scroll_region[3] - scroll_region[1]
+                if self.text_lower is None:
+                    self.build_text_cache()
+                if (old_matcher and old_matcher.mode == matcher.mode == search_matcher.MODE_TEXT
+                        and matcher.query.startswith(old_matcher.query)):
+                    # Typing more characters can only narrow the previous matches
+                    key_matches, value_matches = self.match_rows(matcher, sorted(old_key_matches | old_value_matches))
                 else:
-                    # Fallback
-                    content_height = 1
-                
-                # Height of viewport
-                viewport_height = self.scroll_frame._parent_canvas.winfo_height()
-                
-                # If content fits, no scroll needed
-                if content_height <= viewport_height:
-                    return
-
-                # Calculate fraction
-                # We want the widget to be at the top, or at least visible.
-                # For simplicity, try to center or put at top.
-                fraction = widget_y / content_height
-                
-                self.scroll_frame._parent_canvas.yview_moveto(fraction)
-                
-             except Exception as e:
-                 print(f"Scroll error: {e}")
-                 pass
-
-    def create_comment_row(self, text, row_idx):
-        comment_label = ctk.CTkLabel(
-            self.scroll_frame,
-            text=text.strip(),
-            anchor="w",
-            text_color=theme.TEXT_SECONDARY_COLOR,
-            font=("Arial", 12, "italic"),
-            wraplength=600,
-            justify="left"
-        )
-        comment_label.grid(row=row_idx, column=0, columnspan=2, padx=20, pady=2, sticky="w")
-        self.comment_labels.append(comment_label)
+                    key_matches, value_matches = self.match_rows(matcher)
 
-    def create_section_header(self, text, row_idx):
-        header_label = ctk.CTkLabel(
-            self.scroll_frame,
-            text=text.strip().replace("#","").strip(),
-            anchor="w",
-            text_color=theme.ACCENT_COLOR,
-            font=("Arial", 16, "bold")
-        )
-        header_label.grid(row=row_idx, column=0, columnspan=2, padx=10, pady=(15,5), sticky="w")
-        self.header_labels.append(header_label)
+            # Only rows whose match state flipped need their widgets touched
+            changed = (old_key_matches ^ key_matches) | (old_value_matches ^ value_matches)
+            info["changed"] = len(changed)
+
+        self.matcher = matcher if matcher else None
+        self.search_key = search_key
+        self.key_matches = key_matches
+        self.value_matches = value_matches
+        self.update_match_list()
+        self.match_pos = -1
+        if self.hibernated:
+            return
+
+        visible = self.row_list.visible_rows()
+        for index in changed:
+            row = visible.get(index)
+            if row is not None:
+                self.apply_highlight(row, index)
+
+        if self.match_list:
+            # Scroll to the first match without focusing (to keep search box active)
+            self.goto_match(0)
+        else:
+            self.update_match_label()
+
+    def update_match_list(self):
+        self.match_list = sorted(self.key_matches | self.value_matches)
+
+    def goto_match(self, pos):
+        if not self.match_list:
+            return
+        self.match_pos = pos % len(self.match_list)
+        if not self.hibernated:
+            self.row_list.scroll_to(self.match_list[self.match_pos])
+            self.update_match_label()
+
+    def next_match(self):
+        self.goto_match(self.match_pos + 1)
+
+    def prev_match(self):
+        # From "no match selected yet" this wraps to the last match
+        self.goto_match(self.match_pos - 1 if self.match_pos >= 0 else -1)
+
+    def update_match_label(self):
+        if self.matcher is None:
+            self.match_label.configure(text="")
+        elif not self.match_list:
+            self.match_label.configure(text="No matches")
+        else:
+            self.match_label.configure(text=f"{self.match_pos + 1}/{len(self.match_list)}")
 
     def save_changes(self):
-        # Iterate over entry map
-        changed = False
-        for key, entry_widget in self.entry_map.items():
-            new_val = entry_widget.get()
-            current_val = self.config_file.get_value(key)
-            if new_val != current_val:
-                self.config_file.update_value(key, new_val)
-                changed = True
-        
-        if changed:
-            try:
-                self.config_file.save()
-                # Optional: Show success feedback?
-                self.save_button.configure(text="Saved!", fg_color="#43b581") # Green
-                self.after(2000, lambda: self.save_button.configure(text="Save Changes", fg_color=theme.ACCENT_COLOR))
-            except Exception as e:
-                print(f"Error saving: {e}")
-                self.save_button.configure(text="Error!", fg_color="#f04747") # Red
+        # Only lines the user actually edited need to be written back.
+        # The write happens on the save queue; edits stay pending until it succeeds.
+        edits = dict(self.edits)
+        if not edits and not self.save_queue.is_busy(self.file_path):
+            # With a save queued, an empty set still has to replace its edits (all undone)
+            return
+        invalid = [line_index for line_index in edits if line_index in self.invalid]
+        if invalid:
+            self.show_invalid(min(invalid))
+            return
+        self.set_save_state("Saving...", theme.HOVER_COLOR)
+        self.save_queue.submit(
+            self.file_path,
+            self.config_file,
+            edits,
+            lambda ok, error: self.post(self.on_saved, edits, ok, error)
+        )
+
+    def on_saved(self, edits, ok, error):
+        # Runs on the UI thread once the background save finished
+        if not ok:
+            print(f"Error saving: {error}")
+            # The save already applied the edits to the model; put the disk values back so
+            # the log compares against what is really saved and the edits stay pending.
+            # A save still queued for this file will apply them again and report on its own.
+            if not self.save_queue.is_busy(self.file_path):
+                self.config_file.revert_unsaved()
+            file_cache.invalidate(self.file_path)
+            self.set_save_state("Error!", ERROR_COLOR)
+            return
+
+        # Keep anything typed while the save was in flight
+        try:
+            stat_key = file_cache.stat_key(self.file_path)
+        except OSError:
+            stat_key = None
+        self.log.mark_saved(edits, stat_key)
+        file_cache.put(self.file_path, self.config_file)
+        if self.save_callback:
+            self.save_callback(self.file_path)
+        self.set_save_state("Saved!", "#43b581") # Green
+        self.after(2000, self.reset_save_button)
+
+    def show_invalid(self, line_index):
+        # Refuse to save and point at the first bad value
+        key = self.config_file.lines[line_index].key
+        self.set_save_state("Invalid value", ERROR_COLOR)
+        self.after(2000, self.reset_save_button)
+        if self.hibernated:
+            return
+        self.match_label.configure(text=f"{key}: {self.invalid[line_index]}")
+        index = self.row_for_line(line_index)
+        if index is not None:
+            self.row_list.scroll_to(index)
+
+    def set_save_state(self, text, color):
+        # The button may have been destroyed by hibernation in the meantime
+        if not self.hibernated and self.winfo_exists():
+            self.save_button.configure(text=text, fg_color=color)
+
+    def reset_save_button(self):
+        self.set_save_state("Save Changes", theme.ACCENT_COLOR)
+
+    def destroy(self):
+        # Lazily loaded files keep a memory map open until the tab goes away
+        # (unless a background save is still using it)
+        if not self.save_queue.is_busy(self.file_path):
+            self.config_file.close()
+        super().destroy()
@@ -0,0 +1,120 @@
+import customtkinter as ctk
+import sys
+import os
+import time
+
+# Allow importing from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling
+import theme
+
+HEARTBEAT_MS = 100 # Event-loop lag is how late this timer fires
+REFRESH_MS = 1000
+WARN_COLOR = "#faa61a"
+ERROR_COLOR = "#f04747"
+LAG_WARN_MS = 50
+LAG_ERROR_MS = 200
+
+
+def count_widgets(widget):
+    # Tk widgets in the tree under widget, including widget itself
+    count = 1
+    stack = list(widget.winfo_children())
+    while stack:
+        child = stack.pop()
+        count += 1
+        stack.extend(child.winfo_children())
+    return count
+
+
+def format_ms(ms):
+    return "-" if ms is None else f"{ms:.1f} ms"
+
+
+class PerfBar(ctk.CTkFrame):
+    # Live diagnostics along the bottom of the window (toggled with F12): event-loop lag,
+    # process memory, the last search, and per tab the widget count and last parse/populate
+    # times. It only runs its timers while it is shown.
+
+    def __init__(self, master, get_editors, **kwargs):
+        super().__init__(master, fg_color=theme.HEADER_COLOR, corner_radius=0, **kwargs)
+        self.get_editors = get_editors # get_editors() -> {tab name: EditorView}
+        self.running = False
+        self.heartbeat_id = None
+        self.refresh_id = None
+        self.expected = 0.0 # When the pending heartbeat should fire (time.monotonic)
+        self.lag_ms = 0.0 # Lateness of the last heartbeat
+        self.max_lag_ms = 0.0 # Worst lateness since the last refresh
+
+        self.summary_label = ctk.CTkLabel(self, text="", anchor="w", font=("Consolas", 12), text_color=theme.TEXT_SECONDARY_COLOR)
+        self.summary_label.pack(fill="x", padx=10)
+        self.tabs_label = ctk.CTkLabel(self, text="", anchor="w", justify="left", font=("Consolas", 12),
+                                       text_color=theme.TEXT_SECONDARY_COLOR)
+        self.tabs_label.pack(fill="x", padx=10)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.lag_ms = self.max_lag_ms = 0.0
+        self.schedule_heartbeat()
+        self.refresh()
+
+    def stop(self):
+        self.running = False
+        for after_id in (self.heartbeat_id, self.refresh_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self.heartbeat_id = self.refresh_id = None
+
+    def schedule_heartbeat(self):
+        self.expected = time.monotonic() + HEARTBEAT_MS / 1000
+        self.heartbeat_id = self.after(HEARTBEAT_MS, self.heartbeat)
+
+    def heartbeat(self):
+        self.lag_ms = max(0.0, (time.monotonic() - self.expected) * 1000)
+        self.max_lag_ms = max(self.max_lag_ms, self.lag_ms)
+        self.schedule_heartbeat()
+
+    def refresh(self):
+        lag_color = theme.TEXT_SECONDARY_COLOR
+        if self.max_lag_ms >= LAG_ERROR_MS:
+            lag_color = ERROR_COLOR
+        elif self.max_lag_ms >= LAG_WARN_MS:
+            lag_color = WARN_COLOR
+        parts = [f"lag {self.lag_ms:.0f} ms (max {self.max_lag_ms:.0f})"]
+        self.max_lag_ms = 0.0
+
+        rss = profiling.rss_bytes()
+        parts.append(f"RSS {rss / (1024 * 1024):.0f} MB" if rss is not None else "RSS -")
+
+        search = profiling.last_fields("search")
+        if search is not None:
+            parts.append(f"search {format_ms(profiling.last('search'))}, "
+                         f"{search.get('candidates', 0)} files checked, {search.get('matches', 0)} matches")
+        sync = profiling.last_fields("index_sync")
+        if sync is not None:
+            parts.append(f"index sync {format_ms(profiling.last('index_sync'))}, {sync.get('updated', 0)} files re-read")
+        self.summary_label.configure(text="   |   ".join(parts), text_color=lag_color)
+
+        tabs = []
+        total_widgets = 0
+        for name, editor in self.get_editors().items():
+            if editor.hibernated:
+                widgets = "hibernated"
+            else:
+                count = count_widgets(editor)
+                total_widgets += count
+                widgets = f"{count} widgets"
+            tabs.append(f"{name}: {widgets}, parse {format_ms(profiling.last_for('load', editor.file_path))}, "
+                        f"populate {format_ms(profiling.last_for('populate', editor.file_path))}")
+        if tabs:
+            tabs.insert(0, f"{len(tabs)} tabs, {total_widgets} editor widgets")
+        self.tabs_label.configure(text="\n".join(tabs))
+
+        self.refresh_id = self.after(REFRESH_MS, self.refresh)
+
+    def destroy(self):
+        self.stop()
+        super().destroy()
@@ -0,0 +1,275 @@
+import customtkinter as ctk
+import re
+import sys
+import os
+import threading
+import time
+
+# Allow importing from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_replace
+import theme
+from ui.virtual_list import VirtualList
+
+ROW_HEIGHT = 26
+ERROR_COLOR = "#f04747"
+
+
+class PreviewCancelled(Exception):
+    pass
+
+
+class ReplaceView(ctk.CTkFrame):
+    # Folder-wide find and replace. Preview and apply run on background threads and
+    # report progress through `post` (App.post_to_ui); the preview is shown as one row
+    # per file followed by its changed lines.
+
+    def __init__(self, master, root, get_files, post, fsync=True, close_callback=None, open_callback=None,
+                 before_apply=None, after_apply=None, **kwargs):
+        super().__init__(master, fg_color=theme.FG_COLOR, corner_radius=10, **kwargs)
+        self.root = root
+        self.get_files = get_files
+        self.post = post
+        self.fsync = fsync
+        self.close_callback = close_callback
+        self.open_callback = open_callback
+        self.before_apply = before_apply # before_apply(paths) -> error message or None
+        self.after_apply = after_apply # after_apply(paths) once files were written
+        self.results = []
+        self.rows = [] # Flattened display rows: (kind, text, color, path)
+        self.generation = 0 # Bumped to cancel a preview in flight
+        self.busy = False
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        # Header
+        self.header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.header_frame.pack(fill="x", padx=10, pady=(10, 5))
+
+        self.title_label = ctk.CTkLabel(
+            self.header_frame,
+            text=f"Find & Replace in {self.root}",
+            font=("Arial", 16, "bold"),
+            text_color=theme.TEXT_COLOR,
+            anchor="w"
+        )
+        self.title_label.pack(side="left")
+
+        if self.close_callback:
+            self.close_button = ctk.CTkButton(
+                self.header_frame,
+                text="Close",
+                command=self.close_callback,
+                fg_color=ERROR_COLOR,
+                hover_color="#d84040",
+                text_color=theme.TEXT_COLOR,
+                height=30,
+                width=80,
+                corner_radius=6
+            )
+            self.close_button.pack(side="right", padx=(10, 0))
+
+        # Query
+        self.form_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.form_frame.pack(fill="x", padx=10, pady=5)
+
+        self.find_entry = ctk.CTkEntry(self.form_frame, placeholder_text="Find", width=220)
+        self.find_entry.grid(row=0, column=0, padx=(0, 5))
+        self.find_entry.bind("<Return>", lambda e: self.preview())
+        self.replace_entry = ctk.CTkEntry(self.form_frame, placeholder_text="Replace with", width=220)
+        self.replace_entry.grid(row=0, column=1, padx=5)
+        self.replace_entry.bind("<Return>", lambda e: self.preview())
+
+        self.target_menu = ctk.CTkOptionMenu(
+            self.form_frame,
+            values=[bulk_replace.TARGET_VALUES, bulk_replace.TARGET_KEYS, bulk_replace.TARGET_BOTH],
+            width=90,
+            fg_color=theme.ACCENT_COLOR,
+            button_color=theme.ACCENT_COLOR,
+            button_hover_color=theme.HOVER_COLOR
+        )
+        self.target_menu.grid(row=0, column=2, padx=5)
+
+        self.regex_box = ctk.CTkCheckBox(self.form_frame, text="Regex", width=70, fg_color=theme.ACCENT_COLOR,
+                                         hover_color=theme.HOVER_COLOR, text_color=theme.TEXT_COLOR)
+        self.regex_box.grid(row=0, column=3, padx=5)
+        self.case_box = ctk.CTkCheckBox(self.form_frame, text="Match case", width=90, fg_color=theme.ACCENT_COLOR,
+                                        hover_color=theme.HOVER_COLOR, text_color=theme.TEXT_COLOR)
+        self.case_box.grid(row=0, column=4, padx=5)
+
+        self.preview_button = ctk.CTkButton(
+            self.form_frame,
+            text="Preview",
+            command=self.preview,
+            width=80,
+            fg_color=theme.ACCENT_COLOR,
+            hover_color=theme.HOVER_COLOR,
+            text_color=theme.TEXT_COLOR
+        )
+        self.preview_button.grid(row=0, column=5, padx=5)
+        self.apply_button = ctk.CTkButton(
+            self.form_frame,
+            text="Apply",
+            command=self.apply,
+            width=80,
+            fg_color="#43b581",
+            hover_color="#3ca374",
+            text_color=theme.TEXT_COLOR,
+            state="disabled"
+        )
+        self.apply_button.grid(row=0, column=6, padx=5)
+
+        self.summary_label = ctk.CTkLabel(self, text="", anchor="w", text_color=theme.TEXT_SECONDARY_COLOR)
+        self.summary_label.pack(fill="x", padx=15)
+
+        # Separator (visual)
+        self.separator = ctk.CTkFrame(self, height=2, fg_color=theme.ACCENT_COLOR)
+        self.separator.pack(fill="x", padx=10, pady=5)
+
+        self.row_list = VirtualList(
+            self,
+            row_height=ROW_HEIGHT,
+            create_row=self.create_row,
+            bind_row=self.bind_row
+        )
+        self.row_list.pack(fill="both", expand=True, padx=5, pady=5)
+
+    def set_status(self, text, color=theme.TEXT_SECONDARY_COLOR):
+        self.summary_label.configure(text=text, text_color=color)
+
+    def preview(self):
+        if self.busy or not self.find_entry.get():
+            return
+        try:
+            replacer = bulk_replace.Replacer(
+                self.find_entry.get(),
+                self.replace_entry.get(),
+                regex=bool(self.regex_box.get()),
+                ignore_case=not self.case_box.get(),
+                target=self.target_menu.get()
+            )
+        except re.error as e:
+            self.set_status(f"Bad pattern: {e}", ERROR_COLOR)
+            return
+
+        # A new preview replaces the one in flight
+        self.generation += 1
+        generation = self.generation
+        files = list(self.get_files())
+        self.apply_button.configure(state="disabled")
+        self.set_status(f"Previewing 0/{len(files)} files...")
+
+        def check_cancelled():
+            if generation != self.generation:
+                raise PreviewCancelled()
+
+        def progress(done, total):
+            self.post(self.on_preview_progress, generation, done, total)
+
+        def run():
+            start = time.perf_counter()
+            try:
+                results = bulk_replace.preview_folder(files, replacer, progress=progress, check_cancelled=check_cancelled)
+            except PreviewCancelled:
+                return
+            except Exception as e:
+                self.post(self.set_status, f"Preview failed: {e}", ERROR_COLOR)
+                return
+            self.post(self.show_preview, generation, results, time.perf_counter() - start)
+
+        threading.Thread(target=run, name="ReplacePreview", daemon=True).start()
+
+    def on_preview_progress(self, generation, done, total):
+        if generation == self.generation:
+            self.set_status(f"Previewing {done}/{total} files...")
+
+    def show_preview(self, generation, results, seconds):
+        if generation != self.generation:
+            return
+        self.results = results
+        changed = [r for r in results if r.changes and not r.error]
+        errors = [r for r in results if r.error]
+        lines = sum(len(r.changes) for r in changed)
+        summary = f"{lines} lines in {len(changed)} files will change"
+        if errors:
+            summary += f", {len(errors)} files could not be read"
+        self.set_status(f"{summary}  ({seconds:.2f}s)", ERROR_COLOR if errors else theme.TEXT_SECONDARY_COLOR)
+        self.apply_button.configure(state="normal" if changed and not errors else "disabled")
+
+        rows = []
+        for result in results:
+            rel_path = os.path.relpath(result.path, self.root)
+            if result.error:
+                rows.append(('file', f"{rel_path}  {result.error}", ERROR_COLOR, result.path))
+                continue
+            rows.append(('file', f"{rel_path}  ({len(result.changes)} lines)", theme.HIGHLIGHT_COLOR, result.path))
+            for change in result.changes:
+                if change.new_key != change.old_key:
+                    text = f"{change.line_num + 1}: {change.old_key} = {change.old_value}  →  {change.new_key} = {change.new_value}"
+                else:
+                    text = f"{change.line_num + 1}: {change.old_key} = {change.old_value}  →  {change.new_value}"
+                rows.append(('line', text, theme.TEXT_COLOR, result.path))
+        self.rows = rows
+        self.row_list.set_count(len(rows), reset=True)
+
+    def apply(self):
+        results = [r for r in self.results if r.changes and not r.error]
+        if self.busy or not results:
+            return
+        paths = [r.path for r in results]
+        if self.before_apply:
+            problem = self.before_apply(paths)
+            if problem:
+                self.set_status(problem, ERROR_COLOR)
+                return
+
+        self.busy = True
+        self.generation += 1 # Any preview still running is now stale
+        self.apply_button.configure(state="disabled")
+        self.preview_button.configure(state="disabled")
+        self.set_status(f"Writing {len(results)} files...")
+
+        def progress(done, total):
+            self.post(self.set_status, f"Writing {done}/{total} files...")
+
+        def run():
+            start = time.perf_counter()
+            try:
+                written = bulk_replace.apply_changes(results, fsync=self.fsync, progress=progress)
+            except Exception as e:
+                self.post(self.on_apply_done, None, f"Nothing was changed: {e}", 0)
+                return
+            self.post(self.on_apply_done, written, None, time.perf_counter() - start)
+
+        threading.Thread(target=run, name="ReplaceApply", daemon=True).start()
+
+    def on_apply_done(self, written, error, seconds):
+        self.busy = False
+        self.preview_button.configure(state="normal")
+        if error:
+            self.set_status(error, ERROR_COLOR)
+            self.apply_button.configure(state="normal")
+            return
+        self.results = []
+        self.rows = []
+        self.row_list.set_count(0, reset=True)
+        self.set_status(f"Changed {len(written)} files  ({seconds:.2f}s)", "#43b581")
+        if self.after_apply:
+            self.after_apply(written)
+
+    def create_row(self, master):
+        label = ctk.CTkLabel(master, text="", anchor="w", justify="left")
+        label.path = None
+        # Double-click a row to open the file in the editor
+        label.bind("<Double-Button-1>", lambda e, l=label: self.open_callback and l.path and self.open_callback(l.path))
+        return label
+
+    def bind_row(self, label, index):
+        kind, text, color, path = self.rows[index]
+        label.path = path
+        if kind == 'file':
+            label.configure(text=text, text_color=color, font=("Arial", 13, "bold"), padx=5)
+        else:
+            label.configure(text=text, text_color=color, font=("Consolas", 12), padx=30)
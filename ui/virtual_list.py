@@ -0,0 +1,172 @@
+import customtkinter as ctk
+import sys
+import os
+import weakref
+
+# Allow importing from parent directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theme
+
+class VirtualList(ctk.CTkFrame):
+    # A scrollable list of fixed-height rows that only creates widgets for the visible
+    # window (plus a small overscan) and recycles them while scrolling.
+    #
+    # create_row(master) builds one empty row widget.
+    # bind_row(widget, index) fills a row widget with the data for row `index`.
+
+    WHEEL_UNITS = 3 # Rows scrolled per mouse wheel notch
+
+    _instances = weakref.WeakSet()
+    _wheel_bound = False
+
+    def __init__(self, master, row_height, create_row, bind_row, overscan=4, **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.overscan = overscan
+        self.row_count = 0
+        self.top = 0 # Scroll offset in pixels
+        self.pool = [] # Recycled row widgets
+        self.bound = {} # Maps pool slot to the row index currently shown in it
+        self.placed = set() # Pool slots currently placed in the body
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.body.bind("<Configure>", lambda e: self.render())
+
+        self.scrollbar = ctk.CTkScrollbar(
+            self,
+            command=self.on_scrollbar,
+            button_color=theme.ACCENT_COLOR,
+            button_hover_color=theme.HOVER_COLOR
+        )
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        VirtualList._instances.add(self)
+        if not VirtualList._wheel_bound:
+            # One global handler shared by every list, like CTkScrollableFrame does
+            VirtualList._wheel_bound = True
+            if sys.platform.startswith("linux"):
+                self.bind_all("<Button-4>", VirtualList._on_wheel_all, add=True)
+                self.bind_all("<Button-5>", VirtualList._on_wheel_all, add=True)
+            else:
+                self.bind_all("<MouseWheel>", VirtualList._on_wheel_all, add=True)
+
+    @staticmethod
+    def _on_wheel_all(event):
+        path = str(event.widget)
+        # Pick the innermost list under the pointer
+        target = None
+        for lst in list(VirtualList._instances):
+            own = str(lst)
+            if path == own or path.startswith(own + "."):
+                if target is None or len(own) > len(str(target)):
+                    target = lst
+        if target is None:
+            return
+        if event.num == 4:
+            steps = -1
+        elif event.num == 5:
+            steps = 1
+        elif sys.platform == "darwin":
+            steps = -event.delta
+        else:
+            steps = -int(event.delta / 120) or (-1 if event.delta > 0 else 1)
+        target.scroll_by(steps * VirtualList.WHEEL_UNITS * target.row_height)
+
+    def destroy(self):
+        VirtualList._instances.discard(self)
+        super().destroy()
+
+    def viewport_height(self):
+        return max(self.body.winfo_height(), 1)
+
+    def content_height(self):
+        return self.row_count * self.row_height
+
+    def max_top(self):
+        return max(0, self.content_height() - self.viewport_height())
+
+    def set_count(self, count, reset=False):
+        self.row_count = count
+        if reset:
+            self.top = 0
+        self.top = min(self.top, self.max_top())
+        self.bound.clear()
+        self.render()
+
+    def scroll_to_pixel(self, top):
+        top = int(max(0, min(top, self.max_top())))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def scroll_by(self, pixels):
+        self.scroll_to_pixel(self.top + pixels)
+
+    def scroll_to(self, index):
+        # Bring a row into view, placing it near the top if it is off screen
+        row_top = index * self.row_height
+        if row_top < self.top or row_top + self.row_height > self.top + self.viewport_height():
+            self.scroll_to_pixel(row_top - self.row_height)
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to_pixel(float(amount) * self.content_height())
+        elif action == "scroll":
+            step = self.viewport_height() if unit == "pages" else self.row_height
+            self.scroll_by(int(amount) * step)
+
+    def visible_range(self):
+        height = self.viewport_height()
+        first = self.top // self.row_height
+        last = (self.top + height) // self.row_height + 1
+        start = max(0, first - self.overscan)
+        end = min(self.row_count, last + self.overscan)
+        return start, max(start, end)
+
+    def render(self):
+        start, end = self.visible_range()
+        needed = end - start
+        # Grow the pool if the viewport got taller; rows are never created per item
+        while len(self.pool) < needed:
+            self.pool.append(self.create_row(self.body))
+            self.bound.clear() # Slot assignment depends on pool size
+
+        pool_size = len(self.pool)
+        used = set()
+        for index in range(start, end):
+            slot = index % pool_size # Stable slot: rows that stay visible keep their widget
+            widget = self.pool[slot]
+            used.add(slot)
+            if self.bound.get(slot) != index:
+                self.bind_row(widget, index)
+                self.bound[slot] = index
+            widget.place(x=0, y=index * self.row_height - self.top, relwidth=1.0, height=self.row_height)
+
+        for slot in self.placed - used:
+            self.pool[slot].place_forget()
+            self.bound.pop(slot, None)
+        self.placed = used
+
+        total = self.content_height()
+        if total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.viewport_height()) / total))
+
+    def visible_rows(self):
+        # Maps row index to the widget currently showing it
+        return {index: self.pool[slot] for slot, index in self.bound.items()}
+
+    def refresh(self, indices=None):
+        # Rebind rows whose data changed (all visible rows when indices is None)
+        for slot, index in self.bound.items():
+            if indices is None or index in indices:
+                self.bind_row(self.pool[slot], index)
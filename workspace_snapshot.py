@@ -0,0 +1,84 @@
+import json
+import os
+
+import profiling
+
+# On-disk snapshot of the workspace, written on exit and read on the next start.
+# It holds each root's directory table (so the file lists show up without walking
+# the trees), the search index (lowercase text and trigram postings per file) and the
+# open tabs with their scroll positions. Nothing in it is trusted blindly: the folder
+# is rescanned against directory mtimes and the index re-reads only files whose
+# mtime/size changed, both in the background after the restored state is shown.
+
+SNAPSHOT_FILE = 'workspace.snapshot' # Next to settings.json
+SNAPSHOT_VERSION = 4
+
+# Stored as JSON rather than pickle, so a tampered snapshot can't run code when it is
+# read. JSON has no tuples or sets; they are written as lists and rebuilt on load.
+# Index postings refer to files by their position in the stored file list, so each
+# path is written once rather than once per trigram.
+
+
+def save_snapshot(scanners, index_state, tabs, current_tab=None, path=SNAPSHOT_FILE):
+    # scanners is a list of FolderScanners, one per root; tabs is a list of
+    # (file path, scroll offset in pixels); index_state may be None
+    from config_parser import write_atomic
+
+    index = None
+    if index_state is not None:
+        files, postings = index_state
+        paths = list(files)
+        position = {fpath: i for i, fpath in enumerate(paths)}
+        index = {
+            "files": [[fpath, *files[fpath]] for fpath in paths],
+            "postings": {gram: [position[fpath] for fpath in grams] for gram, grams in postings.items()},
+        }
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "roots": {scanner.root: {"dirs": scanner.dirs, "files": scanner.files} for scanner in scanners},
+        "index": index,
+        "tabs": tabs,
+        "current_tab": current_tab,
+    }
+    files = sum(len(scanner.files) for scanner in scanners)
+    with profiling.span("snapshot_save", files=files):
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        write_atomic(path, lambda f: f.write(payload), fsync=False)
+
+
+def load_snapshot(roots, path=SNAPSHOT_FILE):
+    # Returns the snapshot dict, or None if there is no usable one. Its "roots" maps each
+    # root still in the workspace to (dirs, files); roots added since are scanned from scratch.
+    if not os.path.exists(path):
+        return None
+    with profiling.span("snapshot_load") as info:
+        try:
+            with open(path, 'rb') as f:
+                data = json.loads(f.read())
+            if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+                return None
+            data["roots"] = {root: decode_root(data["roots"][root]) for root in roots if root in data["roots"]}
+            if not data["roots"]:
+                return None
+            if data["index"] is not None:
+                data["index"] = decode_index(data["index"])
+            data["tabs"] = [(tab_path, int(top)) for tab_path, top in data["tabs"]]
+        except Exception as e:
+            print(f"Ignoring unreadable workspace snapshot: {e}")
+            return None
+        info["files"] = sum(len(files) for dirs, files in data["roots"].values())
+    return data
+
+
+def decode_root(entry):
+    # FolderScanner.dirs maps directory to (mtime_ns, files, subdirs)
+    dirs = {directory: (mtime, files, subdirs) for directory, (mtime, files, subdirs) in entry["dirs"].items()}
+    return dirs, list(entry["files"])
+
+
+def decode_index(entry):
+    # SearchIndex.state(): path -> (mtime_ns, size, text), trigram -> set of paths
+    paths = [fpath for fpath, mtime, size, text in entry["files"]]
+    files = {fpath: (mtime, size, text) for fpath, mtime, size, text in entry["files"]}
+    postings = {gram: {paths[i] for i in indices} for gram, indices in entry["postings"].items()}
+    return files, postings